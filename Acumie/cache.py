@@ -0,0 +1,115 @@
+"""
+Versioned cache keys and model-driven invalidation.
+
+A namespace ("po-report", "course:12:sections") owns a version number kept
+in the cache. Keys built with versioned_key() embed it, so bump_version()
+retires everything under the namespace in one write, without tracking
+which keys exist. invalidate_on() bumps namespaces when instances of a
+model are saved or deleted. Bulk writes (bulk_create, QuerySet.update)
+send no signals; code doing them must call bump_version() itself.
+"""
+import threading
+import time
+from collections import Counter
+
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db import connection, transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+
+_MISSING = object()
+_stats_lock = threading.Lock()
+_hits = Counter()
+_misses = Counter()
+
+
+def _version_key(namespace):
+    return f"{namespace}:version"
+
+
+def namespace_version(namespace):
+    version = cache.get(_version_key(namespace))
+    if version is None:
+        # Start from a never-reused value so entries written under an evicted
+        # version cannot resurface.
+        cache.add(_version_key(namespace), time.time_ns(), None)
+        version = cache.get(_version_key(namespace))
+    return version
+
+
+def _set_versions(namespaces):
+    now = time.time_ns()
+    cache.set_many({_version_key(namespace): now for namespace in namespaces}, None)
+
+
+def bump_version(*namespaces):
+    """
+    Retire every key under the namespaces. Inside a transaction the bump is
+    repeated on commit, so values recomputed from pre-commit rows by other
+    requests in the meantime are retired as well.
+    """
+    if not namespaces:
+        return
+    _set_versions(namespaces)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: _set_versions(namespaces))
+
+
+def versioned_key(namespace, *parts):
+    return ":".join([namespace, str(namespace_version(namespace)), *map(str, parts)])
+
+
+def get_or_compute(namespace, parts, compute, timeout=DEFAULT_TIMEOUT, label=None):
+    """
+    Return the cached value for versioned_key(namespace, *parts), calling
+    compute() and storing its result on a miss. `label` groups the hit/miss
+    counters (defaults to the namespace).
+    """
+    key = versioned_key(namespace, *parts)
+    value = cache.get(key, _MISSING)
+    label = label or namespace
+    with _stats_lock:
+        (_misses if value is _MISSING else _hits)[label] += 1
+    if value is _MISSING:
+        value = compute()
+        cache.set(key, value, timeout)
+    return value
+
+
+def cache_stats():
+    with _stats_lock:
+        labels = sorted(set(_hits) | set(_misses))
+        return [{"label": label, "hits": _hits[label], "misses": _misses[label]} for label in labels]
+
+
+def reset_cache_stats():
+    with _stats_lock:
+        _hits.clear()
+        _misses.clear()
+
+
+def _origin_model(origin):
+    return origin.model if isinstance(origin, QuerySet) else type(origin)
+
+
+def invalidate_on(model, namespaces, skip_cascade_from=(), dispatch_uid=None):
+    """
+    Bump namespaces(instance) (a string or an iterable of them) whenever an
+    instance of `model` is saved or deleted. Deletes cascading from a model
+    in skip_cascade_from are ignored; their own handler covers them.
+    """
+    def _bump(sender, instance, origin=None, **kwargs):
+        if origin is not None and skip_cascade_from and _origin_model(origin) in skip_cascade_from:
+            return
+        names = namespaces(instance)
+        bump_version(*([names] if isinstance(names, str) else names))
+
+    uid = dispatch_uid
+    if uid is None:
+        code = getattr(namespaces, "__code__", None)
+        where = f"{namespaces.__module__}:{code.co_firstlineno}" if code else repr(namespaces)
+        uid = f"acumie.cache:{model._meta.label}:{where}"
+    post_save.connect(_bump, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(_bump, sender=model, weak=False, dispatch_uid=uid)
+    return _bump
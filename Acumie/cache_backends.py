@@ -0,0 +1,133 @@
+"""
+An in-process stand-in for Redis.
+
+InProcessRedisCache runs Django's RedisCache and RedisCacheClient code
+against a small dict-backed object that speaks the handful of redis-py
+commands they use, so the Redis configuration can be exercised in tests
+and single-process development without a server or the redis package.
+Stores are shared per LOCATION within the process.
+"""
+import threading
+import time
+
+from django.core.cache.backends.redis import RedisCache, RedisCacheClient, RedisSerializer
+from django.utils.module_loading import import_string
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+class _Pipeline:
+    def __init__(self, server):
+        self._server = server
+        self._calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._calls.append((name, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        return [getattr(self._server, name)(*args, **kwargs) for name, args, kwargs in self._calls]
+
+
+class FakeRedis:
+    """The subset of redis.Redis used by django.core.cache.backends.redis."""
+
+    def __init__(self):
+        self._data = {}
+        self._expires = {}
+        self._lock = threading.RLock()
+
+    def _alive(self, key):
+        expires = self._expires.get(key)
+        if expires is not None and expires <= time.monotonic():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return key in self._data
+
+    def get(self, key):
+        with self._lock:
+            return self._data[key] if self._alive(key) else None
+
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
+
+    def set(self, key, value, ex=None, nx=False):
+        with self._lock:
+            if nx and self._alive(key):
+                return None
+            self._data[key] = value
+            self._expires.pop(key, None)
+            if ex is not None:
+                self._expires[key] = time.monotonic() + ex
+            return True
+
+    def mset(self, mapping):
+        for key, value in mapping.items():
+            self.set(key, value)
+        return True
+
+    def delete(self, *keys):
+        with self._lock:
+            removed = 0
+            for key in keys:
+                if self._alive(key):
+                    removed += 1
+                self._data.pop(key, None)
+                self._expires.pop(key, None)
+            return removed
+
+    def exists(self, key):
+        with self._lock:
+            return int(self._alive(key))
+
+    def incr(self, key, amount=1):
+        with self._lock:
+            value = int(self._data[key]) + amount if self._alive(key) else amount
+            self._data[key] = value
+            return value
+
+    def expire(self, key, seconds):
+        with self._lock:
+            if not self._alive(key):
+                return False
+            if seconds <= 0:
+                self.delete(key)
+            else:
+                self._expires[key] = time.monotonic() + seconds
+            return True
+
+    def persist(self, key):
+        with self._lock:
+            return self._alive(key) and self._expires.pop(key, None) is not None
+
+    def pipeline(self):
+        return _Pipeline(self)
+
+    def flushdb(self):
+        with self._lock:
+            self._data.clear()
+            self._expires.clear()
+            return True
+
+
+class InProcessRedisCacheClient(RedisCacheClient):
+    def __init__(self, servers, serializer=None, **options):
+        if isinstance(serializer, str):
+            serializer = import_string(serializer)
+        if callable(serializer):
+            serializer = serializer()
+        self._serializer = serializer or RedisSerializer()
+        with _stores_lock:
+            self._server = _stores.setdefault(servers[0], FakeRedis())
+
+    def get_client(self, key=None, *, write=False):
+        return self._server
+
+
+class InProcessRedisCache(RedisCache):
+    def __init__(self, server, params):
+        super().__init__(server or "inprocess", params)
+        self._class = InProcessRedisCacheClient
@@ -0,0 +1,228 @@
+"""
+Per-request performance instrumentation.
+
+RequestMetricsMiddleware counts SQL queries and DB time through a connection
+execute_wrapper, template render time through InstrumentedDjangoTemplates,
+and derives the remaining Python time. Each request gets a Server-Timing
+header and one structured log line on the "acumie.requests" logger, and
+per-view samples are kept in a bounded in-process window for the
+admin "Request stats" page (p50/p95). Enable with ACUMIE_REQUEST_METRICS=1.
+
+Streaming responses (the grade book export, the grade entry grid) do most
+of their work while the body is read, after the view has returned. Their
+body is instrumented as it is consumed: the log line and the stats sample
+are recorded once the stream is exhausted or closed, and so include the
+body (and any time the client took to read it). The Server-Timing header
+must be sent before the body, so for them it only covers the work up to
+the first byte and says so with a "stream" entry.
+"""
+import contextvars
+import logging
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template, reraise
+from django.template import TemplateDoesNotExist
+
+logger = logging.getLogger("acumie.requests")
+
+_current = contextvars.ContextVar("acumie_request_metrics", default=None)
+
+
+class RequestMetrics:
+    __slots__ = ("queries", "db_time", "template_time", "template_depth")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+
+
+def _time_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += time.perf_counter() - start
+
+
+class InstrumentedTemplate(Template):
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None or metrics.template_depth:
+            return super().render(context, request)
+        metrics.template_depth += 1
+        start, db_before = time.perf_counter(), metrics.db_time
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.template_depth -= 1
+            # Queries fired by lazy querysets while rendering are already counted as DB time.
+            metrics.template_time += (time.perf_counter() - start) - (metrics.db_time - db_before)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates backend whose templates report render time to the current request."""
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return InstrumentedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+class ViewStats:
+    """Rolling window of (total_ms, db_ms, queries) samples per view, per process."""
+
+    def __init__(self, window):
+        self.window = window
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+        self._lock = threading.Lock()
+
+    def record(self, view, total_ms, db_ms, queries):
+        with self._lock:
+            self._samples[view].append((total_ms, db_ms, queries))
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+    def summary(self):
+        with self._lock:
+            snapshot = {view: list(samples) for view, samples in self._samples.items()}
+        rows = []
+        for view, samples in sorted(snapshot.items()):
+            totals = sorted(s[0] for s in samples)
+            queries = sorted(s[2] for s in samples)
+            rows.append({
+                "view": view,
+                "count": len(samples),
+                "p50_ms": _percentile(totals, 50),
+                "p95_ms": _percentile(totals, 95),
+                "db_ms_avg": sum(s[1] for s in samples) / len(samples),
+                "queries_p50": _percentile(queries, 50),
+                "queries_max": queries[-1],
+            })
+        return rows
+
+
+def _percentile(sorted_values, pct):
+    # Nearest-rank percentile; sorted_values is never empty here.
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[max(rank, 1) - 1]
+
+
+view_stats = ViewStats(getattr(settings, "REQUEST_METRICS_WINDOW", 500))
+
+
+@contextmanager
+def _measuring(metrics):
+    token = _current.set(metrics)
+    try:
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(_time_query))
+            yield
+    finally:
+        _current.reset(token)
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        start = time.perf_counter()
+        with _measuring(metrics):
+            response = self.get_response(request)
+
+        db_ms, tpl_ms, app_ms, total_ms = self._timings(metrics, start)
+        server_timing = (
+            f'db;dur={db_ms:.1f};desc="{metrics.queries} queries", '
+            f"tpl;dur={tpl_ms:.1f}, app;dur={app_ms:.1f}, total;dur={total_ms:.1f}"
+        )
+        if response.streaming and not response.is_async:
+            response["Server-Timing"] = server_timing + ', stream;desc="body not included"'
+            response.streaming_content = self._measured_stream(response.streaming_content, request, response, metrics, start)
+        else:
+            response["Server-Timing"] = server_timing
+            self._record(request, response, metrics, start)
+        return response
+
+    @staticmethod
+    def _timings(metrics, start):
+        total_ms = (time.perf_counter() - start) * 1000
+        db_ms = metrics.db_time * 1000
+        tpl_ms = metrics.template_time * 1000
+        return db_ms, tpl_ms, max(total_ms - db_ms - tpl_ms, 0.0), total_ms
+
+    def _measured_stream(self, content, request, response, metrics, start):
+        # Each chunk is produced under the request's metrics and query wrapper;
+        # the server may pull chunks from another thread than the view ran in.
+        chunks = iter(content)
+        try:
+            while True:
+                with _measuring(metrics):
+                    chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            self._record(request, response, metrics, start, streamed=True)
+
+    def _record(self, request, response, metrics, start, streamed=False):
+        db_ms, tpl_ms, app_ms, total_ms = self._timings(metrics, start)
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match else "<unresolved>"
+        view_stats.record(view, total_ms, db_ms, metrics.queries)
+        logger.info(
+            "view=%s method=%s status=%s queries=%d db_ms=%.1f tpl_ms=%.1f app_ms=%.1f total_ms=%.1f%s",
+            view, request.method, response.status_code, metrics.queries, db_ms, tpl_ms, app_ms, total_ms,
+            " streamed=1" if streamed else "",
+            extra={
+                "view": view,
+                "status_code": response.status_code,
+                "queries": metrics.queries,
+                "db_ms": round(db_ms, 1),
+                "tpl_ms": round(tpl_ms, 1),
+                "app_ms": round(app_ms, 1),
+                "total_ms": round(total_ms, 1),
+                "streamed": streamed,
+            },
+        )
+
+
+def request_stats_view(request):
+    """Admin page with rolling per-view latency and query statistics (wrapped by admin_view)."""
+    from django.contrib import admin
+    from django.shortcuts import redirect, render
+
+    from Acumie.cache import cache_stats, reset_cache_stats
+
+    if request.method == "POST" and "clear" in request.POST:
+        view_stats.clear()
+        reset_cache_stats()
+        return redirect(request.path)
+    context = dict(
+        admin.site.each_context(request),
+        title="Request stats",
+        rows=view_stats.summary(),
+        enabled=getattr(settings, "REQUEST_METRICS_ENABLED", False),
+        window=view_stats.window,
+        cache_rows=cache_stats(),
+    )
+    return render(request, "admin/request_stats.html", context)
@@ -10,11 +10,16 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 
 GRADE_CSV_MAX_BYTES = 5 * 1024 * 1024
 GRADE_CSV_ALLOWED_EXT = ('.csv',)
+# Uploads larger than this are handed to the background job runner (manage.py run_jobs).
+ASYNC_UPLOAD_THRESHOLD_BYTES = 1024 * 1024
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -47,6 +52,8 @@ INSTALLED_APPS = [
     'outcomes',
     'reports',
     'feedback',
+    'jobs',
+    'benchmarks',
 ]
 
 MIDDLEWARE = [
@@ -59,11 +66,18 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Per-request query count / DB / template timing (Server-Timing header, "acumie.requests" log,
+# admin/request-stats/). Cheap enough to leave on; off unless ACUMIE_REQUEST_METRICS=1.
+REQUEST_METRICS_ENABLED = os.environ.get('ACUMIE_REQUEST_METRICS', '0') == '1'
+REQUEST_METRICS_WINDOW = 500
+if REQUEST_METRICS_ENABLED:
+    MIDDLEWARE.insert(0, 'Acumie.instrumentation.RequestMetricsMiddleware')
+
 ROOT_URLCONF = 'Acumie.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'Acumie.instrumentation.InstrumentedDjangoTemplates',
         'DIRS': [BASE_DIR / 'Acumie' / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -90,6 +104,45 @@ DATABASES = {
     }
 }
 
+# Cache backend, picked with ACUMIE_CACHE_BACKEND:
+#   locmem           per-process LRU capped at ACUMIE_CACHE_MAX_ENTRIES (default)
+#   file             shared between processes through ACUMIE_CACHE_DIR
+#   redis            ACUMIE_CACHE_URL; needs the redis package
+#   inprocess-redis  the Redis code path backed by an in-process fake
+CACHE_BACKEND = os.environ.get('ACUMIE_CACHE_BACKEND', 'file' if os.environ.get('ACUMIE_CACHE_DIR') else 'locmem')
+_cache_base = {
+    'TIMEOUT': int(os.environ.get('ACUMIE_CACHE_TIMEOUT', 300)),
+    'KEY_PREFIX': os.environ.get('ACUMIE_CACHE_PREFIX', 'acumie'),
+}
+_cache_max_entries = int(os.environ.get('ACUMIE_CACHE_MAX_ENTRIES', 10000))
+if CACHE_BACKEND == 'locmem':
+    _cache = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'acumie',
+        'OPTIONS': {'MAX_ENTRIES': _cache_max_entries},
+    }
+elif CACHE_BACKEND == 'file':
+    _cache = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('ACUMIE_CACHE_DIR', str(BASE_DIR / 'var' / 'cache')),
+        'OPTIONS': {'MAX_ENTRIES': _cache_max_entries},
+    }
+elif CACHE_BACKEND == 'redis':
+    _cache = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('ACUMIE_CACHE_URL', 'redis://127.0.0.1:6379/0'),
+    }
+elif CACHE_BACKEND == 'inprocess-redis':
+    _cache = {
+        'BACKEND': 'Acumie.cache_backends.InProcessRedisCache',
+        'LOCATION': 'acumie',
+    }
+else:
+    raise ImproperlyConfigured(f"Unknown ACUMIE_CACHE_BACKEND: {CACHE_BACKEND!r}")
+CACHES = {'default': {**_cache_base, **_cache}}
+
+COURSE_FRAGMENT_CACHE_TIMEOUT = 60 * 60
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -134,5 +187,10 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'accounts.CustomUser'
 
+JOBS_SPOOL_DIR = BASE_DIR / 'var' / 'jobs'
+# A job still RUNNING this many seconds after it started is taken to belong to
+# a dead worker and is failed when a worker starts (run_jobs --stale-after).
+JOBS_STALE_AFTER_SECONDS = 6 * 60 * 60
+
 LOGIN_REDIRECT_URL = '/accounts/after-login/'
 LOGOUT_REDIRECT_URL = '/accounts/login/'
\ No newline at end of file
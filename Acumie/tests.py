@@ -0,0 +1,123 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.core.cache.backends.redis import RedisCache
+from django.db.models.signals import post_delete, post_save
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .cache import bump_version, cache_stats, get_or_compute, invalidate_on, reset_cache_stats, versioned_key
+from .instrumentation import view_stats
+
+User = get_user_model()
+
+INSTRUMENTED_MIDDLEWARE = ['Acumie.instrumentation.RequestMetricsMiddleware'] + settings.MIDDLEWARE
+
+
+@override_settings(MIDDLEWARE=INSTRUMENTED_MIDDLEWARE)
+class RequestMetricsMiddlewareTest(TestCase):
+    def setUp(self):
+        view_stats.clear()
+        self.staff = User.objects.create_superuser(username='root', email='root@example.com', password='x')
+        self.client.force_login(self.staff)
+
+    def test_server_timing_header_and_stats(self):
+        with self.assertLogs('acumie.requests', level='INFO') as logs:
+            response = self.client.get(reverse('feedback:feed'))
+        self.assertEqual(response.status_code, 200)
+        header = response['Server-Timing']
+        for metric in ('db;dur=', 'queries"', 'tpl;dur=', 'app;dur=', 'total;dur='):
+            self.assertIn(metric, header)
+        self.assertIn('view=feedback:feed', logs.output[0])
+
+        row = {r['view']: r for r in view_stats.summary()}['feedback:feed']
+        self.assertEqual(row['count'], 1)
+        self.assertGreater(row['queries_max'], 0)
+
+    def test_streamed_body_is_measured_when_consumed(self):
+        response = self.client.get(reverse('grades:export'))
+        self.assertTrue(response.streaming)
+        self.assertIn('stream;desc="body not included"', response['Server-Timing'])
+        self.assertEqual(view_stats.summary(), [])
+
+        with self.assertLogs('acumie.requests', level='INFO') as logs:
+            b"".join(response.streaming_content)
+        self.assertIn('view=grades:export', logs.output[0])
+        self.assertIn('streamed=1', logs.output[0])
+        head_queries = int(response['Server-Timing'].split('desc="')[1].split(' ')[0])
+        row = {r['view']: r for r in view_stats.summary()}['grades:export']
+        # LO codes, PO codes and the grade iterator run while the body is read.
+        self.assertEqual(row['queries_max'], head_queries + 3)
+
+    def test_admin_page(self):
+        with self.assertLogs('acumie.requests', level='INFO'):
+            self.client.get(reverse('feedback:feed'))
+            response = self.client.get(reverse('request_stats'))
+        self.assertContains(response, 'feedback:feed')
+
+
+class VersionedCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_cache_stats()
+
+    def test_get_or_compute_and_bump(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {'value': len(calls)}
+
+        self.assertEqual(get_or_compute('demo', [1], compute), {'value': 1})
+        self.assertEqual(get_or_compute('demo', [1], compute), {'value': 1})
+        bump_version('demo')
+        self.assertEqual(get_or_compute('demo', [1], compute), {'value': 2})
+        self.assertEqual(cache_stats(), [{'label': 'demo', 'hits': 1, 'misses': 2}])
+
+    def test_none_results_are_cached(self):
+        calls = []
+        for _ in range(2):
+            get_or_compute('demo', ['none'], lambda: calls.append(1))
+        self.assertEqual(len(calls), 1)
+
+    def test_versions_survive_eviction_without_reuse(self):
+        key = versioned_key('demo', 'x')
+        cache.delete('demo:version')
+        self.assertNotEqual(versioned_key('demo', 'x'), key)
+
+    def test_invalidate_on_model_changes(self):
+        invalidate_on(User, lambda user: f"user:{user.pk}", dispatch_uid='test-user-cache')
+        self.addCleanup(post_save.disconnect, sender=User, dispatch_uid='test-user-cache')
+        self.addCleanup(post_delete.disconnect, sender=User, dispatch_uid='test-user-cache')
+        user = User.objects.create_user(username='cached', password='x')
+        key = versioned_key(f"user:{user.pk}", 'profile')
+        user.first_name = 'Ada'
+        user.save()
+        self.assertNotEqual(versioned_key(f"user:{user.pk}", 'profile'), key)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'Acumie.cache_backends.InProcessRedisCache', 'LOCATION': 'test'}})
+class InProcessRedisCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_backend_round_trips(self):
+        self.assertIsInstance(caches['default'], RedisCache)
+        cache.set('a', {'x': 1})
+        self.assertEqual(cache.get('a'), {'x': 1})
+        self.assertTrue(cache.add('n', 1))
+        self.assertFalse(cache.add('n', 5))
+        self.assertEqual(cache.incr('n', 4), 5)
+        cache.set_many({'b': 2, 'c': 3})
+        self.assertEqual(cache.get_many(['b', 'c', 'missing']), {'b': 2, 'c': 3})
+        cache.delete_many(['b', 'c'])
+        self.assertIsNone(cache.get('b'))
+        cache.set('gone', 1, timeout=0)
+        self.assertFalse(cache.has_key('gone'))
+        with self.assertRaises(ValueError):
+            cache.incr('missing')
+
+    def test_versioned_helpers_on_redis_backend(self):
+        self.assertEqual(get_or_compute('demo', [1], lambda: 'first'), 'first')
+        bump_version('demo')
+        self.assertEqual(get_or_compute('demo', [1], lambda: 'second'), 'second')
@@ -20,8 +20,10 @@ from django.contrib import admin
 from django.urls import path, include
 from django.views.generic import RedirectView
 from accounts.views import post_login_redirect
+from .instrumentation import request_stats_view
 
 urlpatterns = [
+    path('admin/request-stats/', admin.site.admin_view(request_stats_view), name='request_stats'),
     path('admin/', admin.site.urls),
     
     path('accounts/', include('django.contrib.auth.urls')),
@@ -31,6 +33,10 @@ urlpatterns = [
     path('grades/', include('grades.urls')), 
     
     path('feedback/', include('feedback.urls')),
+
+    path('reports/', include('reports.urls')),
+
+    path('jobs/', include('jobs.urls')),
     
     path('', RedirectView.as_view(pattern_name='grades:dashboard'), name='home'),
     path('accounts/after-login/', post_login_redirect, name='after_login')
@@ -12,7 +12,7 @@ def post_login_redirect(request):
 
     if role == "DEPT_HEAD":
         try:
-            return redirect(reverse("reports:aggregated_po_report"))
+            return redirect(reverse("reports:po_summary"))
         except Exception:
             pass
 
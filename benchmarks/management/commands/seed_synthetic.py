@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from benchmarks.synthetic import SyntheticDataset
+from courses.models import Course
+from grades.models import Grade
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a reproducible synthetic dataset (users, courses, assessments, "
+        "LO/PO links, enrollments, grades, feedback) for load testing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, default=1000)
+        parser.add_argument("--courses", type=int, default=50)
+        parser.add_argument("--assessments", type=int, default=8, help="Assessments per course.")
+        parser.add_argument("--learning-outcomes", type=int, default=4, help="Learning outcomes per course.")
+        parser.add_argument("--program-outcomes", type=int, default=10)
+        parser.add_argument("--courses-per-student", type=int, default=5)
+        parser.add_argument("--feedback-per-student", type=float, default=0.5)
+        parser.add_argument("--seed", type=int, default=2024)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--chunk", type=int, default=1000, help="Students generated per pass.")
+
+    def handle(self, *args, **options):
+        if Course.objects.filter(code__startswith="SYN").exists():
+            raise CommandError("Synthetic courses already exist; seed into an empty database.")
+
+        started = time.perf_counter()
+        dataset = SyntheticDataset(seed=options["seed"], batch_size=options["batch_size"])
+        grades_before = Grade.objects.count()
+        with transaction.atomic():
+            dataset.build_curriculum(
+                courses=options["courses"],
+                assessments_per_course=options["assessments"],
+                los_per_course=options["learning_outcomes"],
+                program_outcomes=options["program_outcomes"],
+            )
+            remaining = options["students"]
+            while remaining > 0:
+                count = min(options["chunk"], remaining)
+                dataset.add_students(
+                    count,
+                    courses_per_student=options["courses_per_student"],
+                    feedback_per_student=options["feedback_per_student"],
+                )
+                remaining -= count
+                self.stdout.write(
+                    f"  {dataset.students_created} students ({time.perf_counter() - started:.1f}s)"
+                )
+            seeded = time.perf_counter() - started
+            dataset.finalize()
+
+        elapsed = time.perf_counter() - started
+        grades = Grade.objects.count() - grades_before
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {dataset.students_created} students, {len(dataset.courses)} courses and "
+            f"{grades} grades in {seeded:.2f}s (+{elapsed - seeded:.2f}s rebuilding derived tables)."
+        ))
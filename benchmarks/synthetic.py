@@ -0,0 +1,175 @@
+"""
+Reproducible synthetic data for benchmarks and load tests.
+
+SyntheticDataset builds a curriculum (program outcomes, courses with
+assessments summing to 100%, LOs, ALO and LO->PO links) and then adds
+students in increments, each with enrollments, grades and Whisper Box
+activity. Every table except grades goes through bulk_create, and all of
+it is driven by a seeded random.Random, so the same arguments always
+produce the same data.
+Grades make up almost all of the volume and are written with a plain
+executemany, which is several times faster than building Grade instances.
+"""
+import random
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.utils import timezone
+
+from accounts.models import UserRole
+from courses.models import Assessment, AssessmentLearningOutcome, Course, CourseMaterial, CourseSection, Enrollment
+from feedback.models import Feedback, FeedbackComment, FeedbackLike
+from grades.models import Grade
+from grades.snapshots import rebuild_all_course_grade_snapshots
+from outcomes.models import LearningOutcome, LO_PO_Contribution, ProgramOutcome
+from outcomes.weights import rebuild_assessment_po_weights
+
+ASSESSMENT_TYPES = [code for code, _ in Assessment.ASSESSMENT_TYPES]
+
+
+def _split_percent(rng, parts, total=100):
+    """`parts` positive whole percentages summing to `total`."""
+    if parts == 1:
+        return [Decimal(total)]
+    cuts = sorted(rng.sample(range(1, total), parts - 1))
+    return [Decimal(b - a) for a, b in zip([0] + cuts, cuts + [total])]
+
+
+class SyntheticDataset:
+    def __init__(self, seed=2024, batch_size=5000):
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.password = make_password(None)
+        self.courses = []
+        self.assessments_by_course = {}
+        self.students_created = 0
+        self.feedback_ids = []
+
+    def _bulk(self, model, objs):
+        return model.objects.bulk_create(objs, batch_size=self.batch_size)
+
+    def _insert_grades(self, rows):
+        """Insert (student_id, assessment_id, score) tuples straight into the grade table."""
+        if not rows:
+            return
+        qn = connection.ops.quote_name
+        opts = Grade._meta
+        columns = [opts.get_field(name).column for name in ("student", "assessment", "score_percentage", "updated_at")]
+        now = opts.get_field("updated_at").get_db_prep_value(timezone.now(), connection)
+        rows = [(*row, now) for row in rows]
+        sql = "INSERT INTO %s (%s) VALUES (%s)" % (
+            qn(opts.db_table), ", ".join(qn(column) for column in columns), ", ".join(["%s"] * len(columns)),
+        )
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, rows)
+
+    def _users(self, prefix, count, role, start=0):
+        User = get_user_model()
+        return self._bulk(User, [
+            User(username=f"{prefix}{start + i:06d}", password=self.password, role=role,
+                 first_name=prefix.capitalize(), last_name=f"{start + i}")
+            for i in range(count)
+        ])
+
+    def build_curriculum(self, courses=50, assessments_per_course=8, los_per_course=4,
+                         program_outcomes=10, sections_per_course=4, courses_per_instructor=5):
+        rng = self.rng
+        po_codes = [f"PO{i + 1:02d}" for i in range(program_outcomes)]
+        ProgramOutcome.objects.bulk_create(
+            [ProgramOutcome(code=code, title=f"Program outcome {code}") for code in po_codes], ignore_conflicts=True,
+        )
+        pos = list(ProgramOutcome.objects.filter(code__in=po_codes).order_by("code"))
+        instructors = self._users("instructor", max(1, -(-courses // courses_per_instructor)), UserRole.INSTRUCTOR)
+        self._users("depthead", 1, UserRole.DEPT_HEAD)
+
+        self.courses = self._bulk(Course, [
+            Course(code=f"SYN{i:04d}", title=f"Synthetic course {i}",
+                   ects_credit=Decimal(rng.choice([3, 4, 5, 6, 7, 8])),
+                   instructor=instructors[i // courses_per_instructor])
+            for i in range(courses)
+        ])
+        los = self._bulk(LearningOutcome, [
+            LearningOutcome(course=course, code=f"LO-{j + 1}", title=f"{course.code} outcome {j + 1}")
+            for course in self.courses for j in range(los_per_course)
+        ])
+        los_by_course = {}
+        for lo in los:
+            los_by_course.setdefault(lo.course_id, []).append(lo)
+
+        contributions = []
+        for lo in los:
+            linked = rng.sample(pos, rng.randint(1, min(3, len(pos))))
+            for po, pct in zip(linked, _split_percent(rng, len(linked))):
+                contributions.append(LO_PO_Contribution(learning_outcome=lo, program_outcome=po, contribution_percentage=pct))
+        self._bulk(LO_PO_Contribution, contributions)
+
+        assessments = []
+        for course in self.courses:
+            for j, weight in enumerate(_split_percent(rng, assessments_per_course)):
+                assessments.append(Assessment(
+                    course=course, name=f"Assessment {j + 1}",
+                    type=ASSESSMENT_TYPES[j % len(ASSESSMENT_TYPES)], weight_percentage=weight,
+                ))
+        assessments = self._bulk(Assessment, assessments)
+        links = []
+        for assessment in assessments:
+            self.assessments_by_course.setdefault(assessment.course_id, []).append(assessment.id)
+            course_los = los_by_course[assessment.course_id]
+            linked = rng.sample(course_los, rng.randint(1, min(2, len(course_los))))
+            for lo, pct in zip(linked, _split_percent(rng, len(linked))):
+                links.append(AssessmentLearningOutcome(assessment=assessment, learning_outcome=lo, contribution_percentage=pct))
+        self._bulk(AssessmentLearningOutcome, links)
+
+        sections = self._bulk(CourseSection, [
+            CourseSection(course=course, title=f"Week {k + 1}", order=k)
+            for course in self.courses for k in range(sections_per_course)
+        ])
+        self._bulk(CourseMaterial, [
+            CourseMaterial(section=section, title=f"{section.title} material {m + 1}",
+                           type=rng.choice(["SLIDE", "LINK", "ANNOUNCEMENT"]), link="https://example.com/")
+            for section in sections for m in range(rng.randint(1, 3))
+        ])
+        return self
+
+    def add_students(self, count, courses_per_student=5, feedback_per_student=0.5,
+                     comments_per_feedback=2, likes_per_feedback=3):
+        """Add `count` students with enrollments, a grade for every assessment and feed activity."""
+        rng = self.rng
+        students = self._users("student", count, UserRole.STUDENT, start=self.students_created)
+        self.students_created += count
+
+        enrollments, grades = [], []
+        for student in students:
+            for course in rng.sample(self.courses, min(courses_per_student, len(self.courses))):
+                enrollments.append(Enrollment(student_id=student.id, course_id=course.id))
+                for assessment_id in self.assessments_by_course[course.id]:
+                    grades.append((student.id, assessment_id, "%d.%02d" % divmod(rng.randint(3000, 10000), 100)))
+                if len(grades) >= self.batch_size:
+                    self._insert_grades(grades)
+                    grades = []
+        self._bulk(Enrollment, enrollments)
+        self._insert_grades(grades)
+
+        feedback = self._bulk(Feedback, [
+            Feedback(course=rng.choice(self.courses), feedback_text=f"Synthetic feedback {i}")
+            for i in range(int(count * feedback_per_student))
+        ])
+        self.feedback_ids.extend(f.id for f in feedback)
+        comments, likes = [], []
+        for item in feedback:
+            for _ in range(rng.randint(0, comments_per_feedback * 2)):
+                comments.append(FeedbackComment(feedback=item, user=rng.choice(students), comment_text="Synthetic reply"))
+            likers = rng.sample(students, min(len(students), rng.randint(0, likes_per_feedback * 2)))
+            likes.extend(FeedbackLike(feedback=item, user=user) for user in likers)
+            item.likes_count = len(likers)
+        self._bulk(FeedbackComment, comments)
+        self._bulk(FeedbackLike, likes)
+        Feedback.objects.bulk_update(feedback, ["likes_count"], batch_size=self.batch_size)
+        return students
+
+    def finalize(self):
+        """Rebuild the derived tables bulk inserts bypass (PO weight index, grade snapshots)."""
+        rebuild_assessment_po_weights()
+        rebuild_all_course_grade_snapshots()
@@ -0,0 +1,124 @@
+import os
+import sys
+import time
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Sum
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from courses.models import Assessment, Course, Enrollment
+from grades.models import CourseGradeSnapshot, Grade
+from outcomes.models import AssessmentPOWeight
+
+from .synthetic import SyntheticDataset
+
+User = get_user_model()
+
+
+def _bench_scales():
+    """Student counts to grow the dataset through; override with ACUMIE_BENCH_SCALES=10,1000,10000."""
+    raw = os.environ.get("ACUMIE_BENCH_SCALES", "10,60")
+    return sorted({int(value) for value in raw.split(",") if value.strip()})
+
+
+class SeedSyntheticCommandTest(TestCase):
+    def seed(self, **options):
+        call_command("seed_synthetic", stdout=StringIO(), **options)
+
+    def test_seeds_consistent_dataset(self):
+        self.seed(students=20, courses=4, assessments=5, courses_per_student=2)
+
+        self.assertEqual(Course.objects.count(), 4)
+        self.assertEqual(User.objects.filter(role="STUDENT").count(), 20)
+        self.assertEqual(Enrollment.objects.count(), 40)
+        self.assertEqual(Grade.objects.count(), 40 * 5)
+        for course in Course.objects.all():
+            total = Assessment.objects.filter(course=course).aggregate(total=Sum("weight_percentage"))["total"]
+            self.assertEqual(total, Decimal("100"))
+        self.assertEqual(CourseGradeSnapshot.objects.count(), 40)
+        self.assertTrue(AssessmentPOWeight.objects.exists())
+
+    def test_same_seed_gives_same_grades(self):
+        self.seed(students=5, courses=3, seed=7)
+        first = list(Grade.objects.order_by("id").values_list("score_percentage", flat=True))
+        Course.objects.all().delete()
+        User.objects.all().delete()
+        self.seed(students=5, courses=3, seed=7)
+        second = list(Grade.objects.order_by("id").values_list("score_percentage", flat=True))
+        self.assertEqual(first, second)
+
+    def test_refuses_to_seed_twice(self):
+        self.seed(students=2, courses=2)
+        with self.assertRaises(CommandError):
+            self.seed(students=2, courses=2)
+
+
+class ViewQueryScalingTest(TestCase):
+    """
+    Regression guard against N+1 patterns: every page must issue the same
+    number of queries whether the database holds 10 or 10,000 students.
+    Set ACUMIE_BENCH_REPORT=1 to print the per-scale query counts and timings.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = SyntheticDataset(seed=20240601).build_curriculum(courses=20, assessments_per_course=6)
+        cls.dataset.add_students(1)
+        cls.student = User.objects.get(username="student000000")
+        cls.course = Enrollment.objects.filter(student=cls.student).select_related("course__instructor").first().course
+        cls.instructor = cls.course.instructor
+        cls.dept_head = User.objects.get(username="depthead000000")
+
+    def targets(self):
+        return {
+            "grade_dashboard": (self.student, reverse("grades:dashboard")),
+            "course_detail_student": (self.student, reverse("courses:detail", args=[self.course.id])),
+            "course_detail_instructor": (self.instructor, reverse("courses:detail", args=[self.course.id])),
+            "teacher_grade_entry": (self.instructor, reverse("grades:teacher_grade_entry", args=[self.course.id])),
+            "teacher_dashboard": (self.instructor, reverse("grades:teacher_dashboard")),
+            "feedback_feed": (self.student, reverse("feedback:feed")),
+            "po_report": (self.dept_head, reverse("reports:po_summary")),
+        }
+
+    def measure(self, user, url):
+        # Measure the cold path: bulk inserts do not invalidate cached fragments.
+        cache.clear()
+        self.client.force_login(user)
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            response = self.client.get(url)
+            if response.streaming:
+                # Streamed pages (the grade entry grid) do most of their work here.
+                b"".join(response.streaming_content)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+        self.assertEqual(response.status_code, 200, url)
+        return len(ctx.captured_queries), elapsed_ms
+
+    def test_query_counts_do_not_grow_with_data(self):
+        samples = {name: [] for name in self.targets()}
+        students = 1
+        for scale in _bench_scales():
+            if scale > students:
+                self.dataset.add_students(scale - students)
+                students = scale
+            self.dataset.finalize()
+            for name, (user, url) in self.targets().items():
+                samples[name].append((scale,) + self.measure(user, url))
+
+        if os.environ.get("ACUMIE_BENCH_REPORT"):
+            for name, rows in samples.items():
+                line = ", ".join(f"{scale}: {queries}q/{ms:.1f}ms" for scale, queries, ms in rows)
+                sys.stderr.write(f"\n{name:<26} {line}")
+            sys.stderr.write("\n")
+
+        for name, rows in samples.items():
+            with self.subTest(view=name):
+                counts = [queries for _, queries, _ in rows]
+                self.assertEqual(len(set(counts)), 1, f"{name} query count grows with data: {rows}")
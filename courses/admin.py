@@ -4,9 +4,10 @@ from django.core.exceptions import ValidationError
 from django.forms.models import BaseInlineFormSet
 from django.urls import path, reverse
 from django.shortcuts import render, redirect
-from django.db import transaction
-import csv, io
+from django.conf import settings
 
+from jobs.runner import enqueue, spool_upload
+from .imports import import_enrollments
 from .models import Course, Assessment, CourseSection, CourseMaterial, Enrollment, AssessmentLearningOutcome
 
 
@@ -109,57 +110,36 @@ class EnrollmentAdmin(admin.ModelAdmin):
                 self.message_user(request, "No file uploaded.", level=messages.ERROR)
                 return redirect(reverse('admin:courses_enrollment_changelist'))
 
+            if csvfile.size > getattr(settings, 'ASYNC_UPLOAD_THRESHOLD_BYTES', 1024 * 1024):
+                job = enqueue('courses.bulk_enroll', {'path': spool_upload(csvfile)}, user=request.user)
+                self.message_user(
+                    request,
+                    f"Large file queued as background job #{job.id}. Progress: {reverse('jobs:status', args=[job.id])}",
+                    level=messages.INFO,
+                )
+                return redirect(reverse('admin:courses_enrollment_changelist'))
+
             try:
-                content = csvfile.read().decode('utf-8')
-            except Exception:
-                try:
-                    content = csvfile.read().decode('latin-1')
-                except Exception as e:
-                    self.message_user(request, f"Could not decode file: {e}", level=messages.ERROR)
-                    return redirect(reverse('admin:courses_enrollment_changelist'))
-
-            reader = csv.DictReader(io.StringIO(content))
-            created = 0
-            errors = []
-            from django.contrib.auth import get_user_model
-            User = get_user_model()
-
-            with transaction.atomic():
-                for i, row in enumerate(reader, start=2):
-                    username = (row.get('username') or row.get('student_username') or '').strip()
-                    email = (row.get('email') or '').strip()
-                    course_code = (row.get('course_code') or row.get('course') or '').strip()
-                    if not (course_code and (username or email)):
-                        errors.append(f"Line {i}: missing required columns (username/email and course_code).")
-                        continue
-                    try:
-                        user_q = User.objects.filter(username=username) if username else User.objects.filter(email=email)
-                        student = user_q.first()
-                        if not student:
-                            errors.append(f"Line {i}: student not found ({username or email}).")
-                            continue
-                        course = Course.objects.filter(code=course_code).first()
-                        if not course:
-                            errors.append(f"Line {i}: course not found ({course_code}).")
-                            continue
-                        Enrollment.objects.get_or_create(student=student, course=course)
-                        created += 1
-                    except Exception as e:
-                        errors.append(f"Line {i}: unexpected error: {e}")
-                        continue
-
-            if created:
-                self.message_user(request, f"Created/ensured {created} enrollment(s).", level=messages.SUCCESS)
-            if errors:
-                for e in errors[:20]:
-                    self.message_user(request, e, level=messages.WARNING)
+                report = import_enrollments(csvfile)
+            except UnicodeDecodeError as e:
+                self.message_user(request, f"Could not decode file: {e}", level=messages.ERROR)
+                return redirect(reverse('admin:courses_enrollment_changelist'))
+
+            self.message_user(
+                request,
+                f"Created {report.created} enrollment(s); skipped {report.skipped} already enrolled; "
+                f"{len(report.errors)} error(s).",
+                level=messages.SUCCESS if not report.errors else messages.WARNING,
+            )
+            for line, message in report.errors[:20]:
+                self.message_user(request, f"Line {line}: {message}", level=messages.WARNING)
             return redirect(reverse('admin:courses_enrollment_changelist'))
 
         context = dict(
             self.admin_site.each_context(request),
             opts=self.model._meta,
         )
-        return render(request, 'admin/courses/enrollment/bulk_enroll.html', context)
+        return render(request, 'admin/courses/bulk_enroll.html', context)
 
 
 @admin.register(Course)
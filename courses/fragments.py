@@ -0,0 +1,33 @@
+"""
+Per-course caches for rendered template fragments of the course page.
+
+Each fragment belongs to an invalidation group (sections, participants)
+whose cache namespace is per course; courses.receivers bumps the
+namespace version when the underlying rows change (see Acumie.cache).
+"""
+from django.conf import settings
+
+from Acumie.cache import bump_version, get_or_compute
+
+SECTIONS = "sections"
+PARTICIPANTS = "participants"
+FRAGMENT_GROUPS = (SECTIONS, PARTICIPANTS)
+
+
+def fragment_namespace(course_id, group):
+    return f"course:{course_id}:{group}"
+
+
+def invalidate_course_fragments(course_id, group):
+    bump_version(fragment_namespace(course_id, group))
+
+
+def render_course_fragment(course_id, group, name, render):
+    """Return the cached HTML for this fragment, calling render() on a miss."""
+    if group not in FRAGMENT_GROUPS:
+        raise ValueError(f"Unknown course fragment group: {group!r}")
+    return get_or_compute(
+        fragment_namespace(course_id, group), [name], render,
+        timeout=getattr(settings, "COURSE_FRAGMENT_CACHE_TIMEOUT", 3600),
+        label=f"fragment:{name}",
+    )
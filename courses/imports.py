@@ -0,0 +1,118 @@
+import codecs
+import csv
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from .fragments import PARTICIPANTS, invalidate_course_fragments
+from .models import Course, Enrollment
+
+ENROLLMENT_IMPORT_BATCH_SIZE = 5000
+
+
+class EnrollmentImportReport:
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.skipped = 0
+        self.errors = []
+
+    def error(self, line, message):
+        self.errors.append((line, message))
+
+    def as_dict(self, max_errors=None):
+        return {
+            "rows": self.rows,
+            "created": self.created,
+            "skipped": self.skipped,
+            "error_count": len(self.errors),
+            "errors": [{"line": line, "message": message} for line, message in self.errors[:max_errors]],
+        }
+
+
+def _flush(batch, report, seen):
+    User = get_user_model()
+    usernames = {username for _, username, _, _ in batch if username}
+    emails = {email for _, username, email, _ in batch if not username}
+    codes = {code for _, _, _, code in batch}
+
+    by_username = dict(User.objects.filter(username__in=usernames).values_list("username", "id"))
+    by_email = {}
+    for email, user_id in User.objects.filter(email__in=emails).order_by("-id").values_list("email", "id"):
+        by_email[email] = user_id  # lowest id wins, matching the old .first()
+    course_ids = dict(Course.objects.filter(code__in=codes).values_list("code", "id"))
+
+    wanted = {}
+    for line, username, email, code in batch:
+        student_id = by_username.get(username) if username else by_email.get(email)
+        if student_id is None:
+            report.error(line, f"student not found ({username or email}).")
+            continue
+        course_id = course_ids.get(code)
+        if course_id is None:
+            report.error(line, f"course not found ({code}).")
+            continue
+        key = (student_id, course_id)
+        if key in seen or key in wanted:
+            report.skipped += 1
+            continue
+        wanted[key] = line
+
+    existing = set(
+        Enrollment.objects.filter(
+            student_id__in={s for s, _ in wanted}, course_id__in={c for _, c in wanted}
+        ).values_list("student_id", "course_id")
+    )
+    to_create = [Enrollment(student_id=s, course_id=c) for (s, c) in wanted if (s, c) not in existing]
+    Enrollment.objects.bulk_create(to_create, batch_size=1000, ignore_conflicts=True)
+    # bulk_create skips the post_save receivers that keep the participant lists fresh.
+    for course_id in {enrollment.course_id for enrollment in to_create}:
+        invalidate_course_fragments(course_id, PARTICIPANTS)
+    report.created += len(to_create)
+    report.skipped += len(wanted) - len(to_create)
+    seen.update(wanted)
+
+
+def import_enrollments(fileobj, batch_size=ENROLLMENT_IMPORT_BATCH_SIZE, progress=None):
+    """
+    Enroll students from a CSV with course_code and username or email columns.
+
+    Rows are streamed and resolved one batch at a time: usernames, emails and
+    course codes each take one IN query, existing enrollments are diffed with a
+    fourth, and the missing ones are inserted with bulk_create. Returns an
+    EnrollmentImportReport with exact created / skipped (already enrolled or
+    repeated in the file) / per-line error counts.
+
+    Each batch commits in its own transaction before `progress` is called
+    with the rows read so far, so a job's progress is visible to other
+    connections during the import; an aborted import keeps the batches
+    already enrolled.
+    """
+    report = EnrollmentImportReport()
+    reader = csv.DictReader(codecs.iterdecode(fileobj, "utf-8-sig"))
+    batch = []
+    seen = set()
+
+    for row in reader:
+        report.rows += 1
+        username = (row.get("username") or row.get("student_username") or "").strip()
+        email = (row.get("email") or "").strip()
+        course_code = (row.get("course_code") or row.get("course") or "").strip()
+        if not (course_code and (username or email)):
+            report.error(reader.line_num, "missing required columns (username/email and course_code).")
+            continue
+        batch.append((reader.line_num, username, email, course_code))
+        if len(batch) >= batch_size:
+            with transaction.atomic():
+                _flush(batch, report, seen)
+            batch = []
+            if progress:
+                progress(report.rows)
+    if batch:
+        with transaction.atomic():
+            _flush(batch, report, seen)
+    if progress:
+        progress(report.rows)
+
+    report.errors.sort()
+    return report
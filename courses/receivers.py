@@ -0,0 +1,22 @@
+from Acumie.cache import invalidate_on
+
+from .fragments import PARTICIPANTS, SECTIONS, fragment_namespace
+from .models import Course, CourseMaterial, CourseSection, Enrollment
+
+# The page is gone with its course, so cascades from a course delete are skipped;
+# materials removed with their section are covered by the section's own bump.
+invalidate_on(
+    CourseSection,
+    lambda section: fragment_namespace(section.course_id, SECTIONS),
+    skip_cascade_from=(Course,),
+)
+invalidate_on(
+    CourseMaterial,
+    lambda material: fragment_namespace(material.section.course_id, SECTIONS),
+    skip_cascade_from=(Course, CourseSection),
+)
+invalidate_on(
+    Enrollment,
+    lambda enrollment: fragment_namespace(enrollment.course_id, PARTICIPANTS),
+    skip_cascade_from=(Course,),
+)
@@ -0,0 +1,15 @@
+from jobs.registry import register
+from jobs.runner import discard_spooled_file
+from .imports import import_enrollments
+
+MAX_REPORTED_ERRORS = 1000
+
+
+@register("courses.bulk_enroll")
+def bulk_enroll_job(job, payload):
+    try:
+        with open(payload["path"], "rb") as f:
+            report = import_enrollments(f, progress=job.set_progress)
+    finally:
+        discard_spooled_file(payload["path"])
+    return report.as_dict(max_errors=MAX_REPORTED_ERRORS)
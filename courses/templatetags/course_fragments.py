@@ -0,0 +1,38 @@
+from django import template
+
+from courses.fragments import render_course_fragment
+
+register = template.Library()
+
+
+class CourseFragmentNode(template.Node):
+    def __init__(self, nodelist, group, course_id, name):
+        self.nodelist = nodelist
+        self.group = group
+        self.course_id = course_id
+        self.name = name
+
+    def render(self, context):
+        group = self.group.resolve(context)
+        name = self.name.resolve(context) if self.name else group
+        return render_course_fragment(
+            self.course_id.resolve(context), group, name, lambda: self.nodelist.render(context)
+        )
+
+
+@register.tag
+def course_fragment(parser, token):
+    """
+    Cache the enclosed markup per course until its group is invalidated:
+
+        {% course_fragment "sections" course.id "nav" %} ... {% endcourse_fragment %}
+
+    The optional last argument names the fragment when a group has several.
+    """
+    bits = token.split_contents()
+    if len(bits) not in (3, 4):
+        raise template.TemplateSyntaxError(f"'{bits[0]}' takes a group, a course id and an optional name.")
+    nodelist = parser.parse(("endcourse_fragment",))
+    parser.delete_first_token()
+    name = parser.compile_filter(bits[3]) if len(bits) == 4 else None
+    return CourseFragmentNode(nodelist, parser.compile_filter(bits[1]), parser.compile_filter(bits[2]), name)
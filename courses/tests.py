@@ -1,7 +1,22 @@
 from django.test import TestCase
+from django.db import connection
 from django.db.utils import IntegrityError
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from Acumie.cache import cache_stats, reset_cache_stats
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 from decimal import Decimal
-from .models import Course
+from io import BytesIO
+from feedback.models import FeedbackRequest
+from grades.models import Grade
+from outcomes.models import LearningOutcome
+from .imports import import_enrollments
+from .models import Assessment, AssessmentLearningOutcome, Course, CourseMaterial, CourseSection, Enrollment
+from .views import COURSE_DETAIL_QUERY_BUDGET
+
+User = get_user_model()
 
 
 class CourseModelTest(TestCase):
@@ -39,3 +54,162 @@ class CourseModelTest(TestCase):
         course_id = self.course.id
         self.course.delete()
         self.assertFalse(Course.objects.filter(id=course_id).exists())
+
+
+class EnrollmentImportTest(TestCase):
+    def setUp(self):
+        self.course = Course.objects.create(title="Operating Systems", code="CSE311", ects_credit=Decimal('6.00'))
+        self.other = Course.objects.create(title="Automata", code="CSE312", ects_credit=Decimal('5.00'))
+        self.ada = User.objects.create_user(username='ada', email='ada@example.com', password='x', role='STUDENT')
+        self.alan = User.objects.create_user(username='alan', email='alan@example.com', password='x', role='STUDENT')
+        Enrollment.objects.create(student=self.alan, course=self.course)
+
+    def csv_bytes(self, lines):
+        return ("username,email,course_code\n" + "".join(f"{line}\n" for line in lines)).encode()
+
+    def test_counts_are_exact(self):
+        data = self.csv_bytes([
+            "ada,,CSE311",
+            ",alan@example.com,CSE312",
+            "alan,,CSE311",
+            "ada,,CSE311",
+            "ghost,,CSE311",
+            "ada,,NOPE",
+            ",,CSE311",
+        ])
+        report = import_enrollments(BytesIO(data), batch_size=3)
+        self.assertEqual((report.rows, report.created, report.skipped), (7, 2, 2))
+        self.assertEqual([line for line, _ in report.errors], [6, 7, 8])
+        self.assertEqual(
+            set(Enrollment.objects.values_list('student__username', 'course__code')),
+            {('ada', 'CSE311'), ('alan', 'CSE311'), ('alan', 'CSE312')},
+        )
+
+    def test_query_count_does_not_grow_with_rows(self):
+        for i in range(5):
+            User.objects.create_user(username=f'extra{i}', email=f'extra{i}@example.com', password='x')
+        with CaptureQueriesContext(connection) as small:
+            import_enrollments(BytesIO(self.csv_bytes(["ada,,CSE311", ",alan@example.com,CSE312"])))
+        lines = [f"extra{i},,CSE311" for i in range(5)] + [f",extra{i}@example.com,CSE312" for i in range(5)]
+        with CaptureQueriesContext(connection) as large:
+            import_enrollments(BytesIO(self.csv_bytes(lines)))
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+    def test_admin_bulk_enroll_view(self):
+        admin_user = User.objects.create_superuser(username='root', email='root@example.com', password='x')
+        self.client.force_login(admin_user)
+        url = reverse('admin:courses_enrollment_bulk_enroll')
+        self.assertEqual(self.client.get(url).status_code, 200)
+        upload = SimpleUploadedFile("enroll.csv", self.csv_bytes(["ada,,CSE312"]))
+        self.client.post(url, {"csv_file": upload})
+        self.assertTrue(Enrollment.objects.filter(student=self.ada, course=self.other).exists())
+
+
+class CourseDetailQueryBudgetTest(TestCase):
+    # Session and user lookups made by the auth middleware.
+    AUTH_QUERIES = 2
+
+    def setUp(self):
+        cache.clear()
+        self.instructor = User.objects.create_user(username='prof', password='x', role='INSTRUCTOR', first_name='Grace')
+        self.student = User.objects.create_user(username='learner', password='x', role='STUDENT')
+        self.course = Course.objects.create(title="Databases", code="CSE348", ects_credit=Decimal('6.00'), instructor=self.instructor)
+        self.url = reverse('courses:detail', args=[self.course.id])
+        Enrollment.objects.create(student=self.student, course=self.course)
+        self.grow(1)
+
+    def grow(self, count):
+        start = CourseSection.objects.count()
+        for i in range(start, start + count):
+            section = CourseSection.objects.create(course=self.course, title=f"Week {i}", order=i)
+            CourseMaterial.objects.create(section=section, title=f"Slides {i}")
+            CourseMaterial.objects.create(section=section, title=f"Reading {i}", type='LINK', link='https://example.com/')
+            assessment = Assessment.objects.create(course=self.course, type='QUIZ', weight_percentage=1)
+            lo = LearningOutcome.objects.create(course=self.course, title=f"Outcome {i}")
+            AssessmentLearningOutcome.objects.create(assessment=assessment, learning_outcome=lo, contribution_percentage=100)
+            other = User.objects.create(username=f"peer{i}", role='STUDENT')
+            Enrollment.objects.create(student=other, course=self.course)
+            for student in (self.student, other):
+                Grade.objects.create(student=student, assessment=assessment, score_percentage=70)
+            FeedbackRequest.objects.create(student=self.student, assessment=assessment)
+
+    def get_query_count(self, user):
+        self.client.force_login(user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_student_page_fits_budget(self):
+        before = self.get_query_count(self.student)
+        self.grow(5)
+        self.assertEqual(self.get_query_count(self.student), before)
+        self.assertEqual(before, COURSE_DETAIL_QUERY_BUDGET + self.AUTH_QUERIES)
+
+    def test_instructor_page_fits_budget(self):
+        before = self.get_query_count(self.instructor)
+        self.grow(5)
+        self.assertEqual(self.get_query_count(self.instructor), before)
+        self.assertLessEqual(before, COURSE_DETAIL_QUERY_BUDGET + self.AUTH_QUERIES)
+
+    def test_learning_outcomes_listed_once(self):
+        lo = LearningOutcome.objects.get(title="Outcome 0")
+        second = Assessment.objects.create(course=self.course, type='FINAL', weight_percentage=50)
+        AssessmentLearningOutcome.objects.create(assessment=second, learning_outcome=lo, contribution_percentage=100)
+        self.client.force_login(self.student)
+        response = self.client.get(self.url)
+        self.assertEqual(list(response.context['learning_outcomes']), [lo])
+
+
+class CourseFragmentCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_cache_stats()
+        self.course = Course.objects.create(title="Networks", code="CSE331", ects_credit=Decimal('5.00'))
+        self.section = CourseSection.objects.create(course=self.course, title="Week 1")
+        CourseMaterial.objects.create(section=self.section, title="Intro slides")
+        self.students = [User.objects.create(username=f"viewer{i}", role='STUDENT') for i in range(3)]
+        for student in self.students:
+            Enrollment.objects.create(student=student, course=self.course)
+        self.url = reverse('courses:detail', args=[self.course.id])
+
+    def get(self, user):
+        self.client.force_login(user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        return response, len(ctx.captured_queries)
+
+    def test_second_viewer_skips_section_and_participant_queries(self):
+        _, cold = self.get(self.students[0])
+        response, warm = self.get(self.students[1])
+        # sections, materials and participants come from the cache
+        self.assertEqual(cold - warm, 3)
+        self.assertContains(response, "Intro slides")
+        self.assertContains(response, "@viewer2")
+        stats = {row['label']: row for row in cache_stats()}
+        self.assertEqual(stats['fragment:sections_body'], {'label': 'fragment:sections_body', 'hits': 1, 'misses': 1})
+        self.assertEqual(stats['fragment:participants']['hits'], 1)
+
+    def test_material_and_section_changes_invalidate(self):
+        self.get(self.students[0])
+        material = CourseMaterial.objects.create(section=self.section, title="Lab sheet")
+        self.assertContains(self.get(self.students[1])[0], "Lab sheet")
+        material.delete()
+        self.assertNotContains(self.get(self.students[1])[0], "Lab sheet")
+        self.section.title = "Week one"
+        self.section.save()
+        self.assertContains(self.get(self.students[1])[0], "Week one")
+
+    def test_enrollment_changes_invalidate(self):
+        self.get(self.students[0])
+        newcomer = User.objects.create(username="latecomer", role='STUDENT')
+        Enrollment.objects.create(student=newcomer, course=self.course)
+        self.assertContains(self.get(self.students[0])[0], "@latecomer")
+        Enrollment.objects.filter(student=newcomer).delete()
+        self.assertNotContains(self.get(self.students[0])[0], "@latecomer")
+
+    def test_bulk_enrollment_import_invalidates(self):
+        self.get(self.students[0])
+        User.objects.create(username="imported", role='STUDENT')
+        import_enrollments(BytesIO(b"username,email,course_code\nimported,,CSE331\n"))
+        self.assertContains(self.get(self.students[0])[0], "@imported")
@@ -1,29 +1,33 @@
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.core.exceptions import FieldDoesNotExist
 from django.shortcuts import redirect
 from django.db import transaction
 from django.http import HttpResponseForbidden
 from .forms import CourseForm, AssessmentFormSet, AssessmentLearningOutcomeFormSet
-from .models import Course
+from .models import AssessmentLearningOutcome, Course
 from grades.models import Grade
 from feedback.models import FeedbackRequest
 from outcomes.models import LearningOutcome
 
+# Queries issued by course_detail_view on top of session/auth, whatever the
+# number of sections, materials, participants or grades: course (with its
+# instructor), sections, materials, participants, learning outcomes, grades,
+# and the student's feedback requests.
+COURSE_DETAIL_QUERY_BUDGET = 7
+
+
 @login_required
 def course_detail_view(request, course_id):
-    course = get_object_or_404(Course, id=course_id)
-    
+    course = get_object_or_404(Course.objects.select_related('instructor'), id=course_id)
+
     sections = course.sections.prefetch_related('materials').all()
-    
+
     participants = course.enrollments.select_related('student').all()
 
-    learning_outcomes = (
-        LearningOutcome.objects
-        .filter(assessments__course=course)
-        .distinct()
-        .order_by('code')
-    )
+    assessed_lo_ids = AssessmentLearningOutcome.objects.filter(
+        assessment__course=course
+    ).values('learning_outcome_id')
+    learning_outcomes = LearningOutcome.objects.filter(id__in=assessed_lo_ids).order_by('code')
 
     requested_assessment_ids = []
     teacher_feedback_requests = []
@@ -31,42 +35,28 @@ def course_detail_view(request, course_id):
 
     user = request.user
 
-    try:
-        Grade._meta.get_field('learning_outcome')
-        has_learning_outcome = True
-    except FieldDoesNotExist:
-        has_learning_outcome = False
-
     if getattr(user, "role", "") == 'STUDENT':
-        qs = Grade.objects.filter(
-            student=user,
-            assessment__course=course
-        ).select_related('assessment', 'student')
-
-        if has_learning_outcome:
-            qs = qs.prefetch_related('learning_outcome').order_by('assessment__type', 'learning_outcome__code')
-        else:
-            qs = qs.order_by('assessment__type')
-
-        student_grades = qs
+        student_grades = (
+            Grade.objects
+            .filter(student=user, assessment__course=course)
+            .select_related('assessment', 'student')
+            .order_by('assessment__type')
+        )
 
         requested_assessment_ids = list(
             FeedbackRequest.objects
             .filter(student=user, assessment__course=course)
             .values_list('assessment_id', flat=True)
-            .distinct()
         )
         is_instructor = False
 
     elif getattr(user, "role", "") == 'INSTRUCTOR' or user.is_staff:
-        qs = Grade.objects.filter(assessment__course=course).select_related('assessment', 'student')
-
-        if has_learning_outcome:
-            qs = qs.prefetch_related('learning_outcome').order_by('student__first_name', 'assessment__type', 'learning_outcome__code')
-        else:
-            qs = qs.order_by('student__first_name', 'assessment__type')
-
-        student_grades = qs
+        student_grades = (
+            Grade.objects
+            .filter(assessment__course=course)
+            .select_related('assessment', 'student')
+            .order_by('student__first_name', 'assessment__type')
+        )
         is_instructor = True
 
         teacher_feedback_requests = (
@@ -79,7 +69,6 @@ def course_detail_view(request, course_id):
         student_grades = []
         is_instructor = False
 
-
     context = {
         'course': course,
         'sections': sections,
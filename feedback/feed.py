@@ -0,0 +1,57 @@
+"""
+Keyset pagination for the Whisper Box feed.
+
+Pages are ordered by (created_at, id) descending and addressed by an opaque
+cursor holding the last row's key, so fetching page 500 costs the same as
+page 1. Each row carries a comment_count annotation and only its latest
+FEED_COMMENT_PREVIEW comments.
+"""
+import base64
+from datetime import datetime
+
+from django.db.models import Count, Prefetch, Q
+
+from .models import Feedback, FeedbackComment
+
+FEED_PAGE_SIZE = 20
+FEED_COMMENT_PREVIEW = 3
+
+
+def encode_cursor(feedback):
+    raw = f"{feedback.created_at.isoformat()}|{feedback.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """Return (created_at, id) for a cursor token; raises ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        created_at, pk = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(pk)
+    except (TypeError, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError(f"Invalid feed cursor: {token!r}") from exc
+
+
+def get_feed_page(cursor=None, page_size=FEED_PAGE_SIZE, comment_preview=FEED_COMMENT_PREVIEW):
+    """
+    One page of the feed as (items, next_cursor). next_cursor is None on the last page.
+    Every item has .comment_count and .recent_comments (oldest first).
+    """
+    latest_comments = FeedbackComment.objects.order_by("-created_at", "-id")[:comment_preview]
+    qs = (
+        Feedback.objects
+        .select_related("course")
+        .annotate(comment_count=Count("comments"))
+        .prefetch_related(Prefetch("comments", queryset=latest_comments, to_attr="recent_comments"))
+        .order_by("-created_at", "-id")
+    )
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        qs = qs.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+    items = list(qs[:page_size + 1])
+    next_cursor = encode_cursor(items[page_size - 1]) if len(items) > page_size else None
+    items = items[:page_size]
+    for item in items:
+        item.recent_comments.reverse()
+    return items, next_cursor
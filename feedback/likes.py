@@ -0,0 +1,95 @@
+"""
+Like toggling without read-modify-write.
+
+A click is a DELETE of the (user, feedback) like; only if nothing was
+deleted do we INSERT one (ignoring a conflicting concurrent insert). The
+counter then moves by the actual delta in an UPDATE ... RETURNING, so
+there are no locking reads and no refresh_from_db. Counter drift (e.g.
+rows removed behind the ORM's back) is repaired by reconcile_like_counts,
+run periodically via `manage.py reconcile_likes`.
+"""
+from django.db import connection, transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.constants import OnConflict
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Feedback, FeedbackLike
+
+# Backends that accept UPDATE ... RETURNING (SQLite only from 3.35, which
+# is what can_return_columns_from_insert tracks there).
+UPDATE_RETURNING_VENDORS = {"sqlite", "postgresql"}
+
+
+def _insert_like(cursor, user_id, feedback_id):
+    """Insert the like if the feedback exists and the user hasn't liked it; returns rows inserted."""
+    qn = connection.ops.quote_name
+    like_opts, feedback_opts = FeedbackLike._meta, Feedback._meta
+    columns = [like_opts.get_field(name).column for name in ("user", "feedback", "created_at")]
+    sql = "%s %s (%s) SELECT %%s, %s, %%s FROM %s WHERE %s = %%s %s" % (
+        connection.ops.insert_statement(on_conflict=OnConflict.IGNORE),
+        qn(like_opts.db_table),
+        ", ".join(qn(column) for column in columns),
+        qn(feedback_opts.pk.column),
+        qn(feedback_opts.db_table),
+        qn(feedback_opts.pk.column),
+        connection.ops.on_conflict_suffix_sql(
+            [like_opts.get_field("user"), like_opts.get_field("feedback")], OnConflict.IGNORE, None, None,
+        ),
+    )
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    cursor.execute(sql, [user_id, now, feedback_id])
+    return cursor.rowcount
+
+
+def _bump_likes_count(cursor, feedback_id, delta):
+    """Apply delta to likes_count and return the new value, or None if the feedback is gone."""
+    qn = connection.ops.quote_name
+    opts = Feedback._meta
+    column = qn(opts.get_field("likes_count").column)
+    sql = "UPDATE %s SET %s = %s + %%s WHERE %s = %%s" % (
+        qn(opts.db_table), column, column, qn(opts.pk.column),
+    )
+    if connection.vendor in UPDATE_RETURNING_VENDORS and connection.features.can_return_columns_from_insert:
+        cursor.execute(f"{sql} RETURNING {column}", [delta, feedback_id])
+        row = cursor.fetchone()
+        return row[0] if row else None
+    cursor.execute(sql, [delta, feedback_id])
+    if not cursor.rowcount:
+        return None
+    return Feedback.objects.filter(pk=feedback_id).values_list("likes_count", flat=True).first()
+
+
+def toggle_feedback_like(user_id, feedback_id):
+    """
+    Flip the user's like on a feedback post.
+    Returns (liked, likes_count), or None when the feedback does not exist.
+    """
+    with transaction.atomic():
+        deleted, _ = FeedbackLike.objects.filter(user_id=user_id, feedback_id=feedback_id).delete()
+        with connection.cursor() as cursor:
+            if deleted:
+                liked, delta = False, -1
+            else:
+                liked, delta = True, _insert_like(cursor, user_id, feedback_id)
+            likes_count = _bump_likes_count(cursor, feedback_id, delta)
+    if likes_count is None:
+        return None
+    return liked, likes_count
+
+
+def reconcile_like_counts():
+    """Recompute likes_count from FeedbackLike rows wherever it has drifted; returns rows fixed."""
+    actual = Coalesce(
+        Subquery(
+            FeedbackLike.objects
+            .filter(feedback=OuterRef("pk"))
+            .order_by()
+            .values("feedback")
+            .annotate(total=Count("*"))
+            .values("total"),
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+    return Feedback.objects.exclude(likes_count=actual).update(likes_count=actual)
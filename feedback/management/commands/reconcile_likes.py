@@ -0,0 +1,15 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from feedback.likes import reconcile_like_counts
+
+
+class Command(BaseCommand):
+    help = "Recompute Feedback.likes_count from FeedbackLike rows where they disagree."
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        fixed = reconcile_like_counts()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Reconciled {fixed} like counter(s) in {elapsed:.2f}s."))
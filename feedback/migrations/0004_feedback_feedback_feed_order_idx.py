@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0003_feedback_likes_count_feedbackcomment_feedbacklike'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['-created_at', '-id'], name='feedback_feed_order_idx'),
+        ),
+    ]
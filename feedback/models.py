@@ -19,6 +19,7 @@ class Feedback(models.Model):
         verbose_name = "Whisper Box Feedback"
         verbose_name_plural = "Whisper Box Feedbacks"
         ordering = ['-created_at']
+        indexes = [models.Index(fields=['-created_at', '-id'], name='feedback_feed_order_idx')]
 
     def __str__(self):
         course_name = self.course.code if self.course else "General"
@@ -1,9 +1,16 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.auth import get_user_model
+from feedback.feed import FEED_COMMENT_PREVIEW, FEED_PAGE_SIZE, get_feed_page
+from feedback.likes import reconcile_like_counts, toggle_feedback_like
 from feedback.models import Feedback, FeedbackLike, FeedbackComment, FeedbackRequest
 from courses.models import Course, Assessment
-import json
 
 User = get_user_model()
 
@@ -123,6 +130,46 @@ class FeedbackViewTest(FeedbackBaseSetup):
         self.assertEqual(data['likes_count'], 0)
         self.assertFalse(FeedbackLike.objects.filter(user=self.student, feedback=self.feedback1).exists())
         
+    def test_toggle_like_twice_restores_state(self):
+        self.client.force_login(self.student)
+        self.client.post(self.toggle_like_url)
+        data = self.client.post(self.toggle_like_url).json()
+        self.assertFalse(data['liked'])
+        self.assertEqual(data['likes_count'], 0)
+        self.feedback1.refresh_from_db()
+        self.assertEqual(self.feedback1.likes_count, 0)
+
+    def test_toggle_like_statement_count(self):
+        self.client.force_login(self.student)
+        with CaptureQueriesContext(connection) as ctx:
+            toggle_feedback_like(self.student.id, self.feedback1.id)
+        writes = [q['sql'] for q in ctx.captured_queries if 'SAVEPOINT' not in q['sql']]
+        self.assertEqual(len(writes), 3)
+        self.assertIn('RETURNING', writes[-1])
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(toggle_feedback_like(self.student.id, self.feedback1.id), (False, 0))
+        self.assertEqual(len([q for q in ctx.captured_queries if 'SAVEPOINT' not in q['sql']]), 2)
+
+    def test_toggle_like_missing_feedback(self):
+        self.client.force_login(self.student)
+        response = self.client.post(reverse('feedback:toggle_like', args=[999999]))
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(FeedbackLike.objects.exists())
+
+    def test_reconcile_likes_repairs_drift(self):
+        FeedbackLike.objects.create(user=self.student, feedback=self.feedback1)
+        FeedbackLike.objects.create(user=self.instructor, feedback=self.feedback1)
+        Feedback.objects.filter(pk=self.feedback1.pk).update(likes_count=7)
+        Feedback.objects.filter(pk=self.feedback2.pk).update(likes_count=3)
+
+        call_command('reconcile_likes', stdout=StringIO())
+
+        self.assertEqual(
+            dict(Feedback.objects.values_list('id', 'likes_count')),
+            {self.feedback1.id: 2, self.feedback2.id: 0},
+        )
+        self.assertEqual(reconcile_like_counts(), 0)
+
     def test_add_comment_success(self):
         self.client.force_login(self.student)
         comment_data = {
@@ -153,4 +200,65 @@ class FeedbackViewTest(FeedbackBaseSetup):
         response = self.client.post(self.request_feedback_url, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
         self.assertEqual(response.status_code, 200)
         data = json.loads(response.content)
-        self.assertEqual(data['status'], 'warning')
\ No newline at end of file
+        self.assertEqual(data['status'], 'warning')
+
+class FeedbackFeedPaginationTest(TestCase):
+    def setUp(self):
+        self.student = User.objects.create_user(username='reader', password='x', role='STUDENT')
+        self.client.force_login(self.student)
+
+    def post(self, count, comments=0):
+        items = [Feedback.objects.create(feedback_text=f"Whisper {i}") for i in range(count)]
+        for item in items:
+            for j in range(comments):
+                FeedbackComment.objects.create(feedback=item, user=self.student, comment_text=f"{item.feedback_text} reply {j}")
+        return items
+
+    def test_cursor_walks_every_post_once_in_order(self):
+        self.post(7)
+        seen, cursor = [], None
+        while True:
+            items, cursor = get_feed_page(cursor, page_size=3)
+            seen.extend(item.feedback_text for item in items)
+            if cursor is None:
+                break
+        self.assertEqual(seen, [f"Whisper {i}" for i in reversed(range(7))])
+
+    def test_ties_on_created_at_are_broken_by_id(self):
+        items = self.post(4)
+        Feedback.objects.update(created_at=items[0].created_at)
+        first, cursor = get_feed_page(page_size=2)
+        second, _ = get_feed_page(cursor, page_size=2)
+        self.assertEqual([f.id for f in first + second], sorted((f.id for f in items), reverse=True))
+
+    def test_comment_preview_and_counts(self):
+        self.post(1, comments=FEED_COMMENT_PREVIEW + 2)
+        item = get_feed_page()[0][0]
+        self.assertEqual(item.comment_count, FEED_COMMENT_PREVIEW + 2)
+        self.assertEqual(
+            [c.comment_text for c in item.recent_comments],
+            [f"Whisper 0 reply {j}" for j in range(2, FEED_COMMENT_PREVIEW + 2)],
+        )
+
+    def test_page_queries_do_not_depend_on_feed_size(self):
+        self.post(3, comments=2)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(reverse('feedback:feed'))
+        self.post(FEED_PAGE_SIZE * 2, comments=5)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(reverse('feedback:feed'))
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+        self.assertEqual(len(response.context['feedbacks']), FEED_PAGE_SIZE)
+        self.assertIsNotNone(response.context['next_cursor'])
+
+    def test_json_page_endpoint(self):
+        self.post(FEED_PAGE_SIZE + 2)
+        cursor = self.client.get(reverse('feedback:feed')).context['next_cursor']
+        data = self.client.get(reverse('feedback:feed_page'), {'cursor': cursor}).json()
+        self.assertEqual([item['feedback_text'] for item in data['items']], ["Whisper 1", "Whisper 0"])
+        self.assertIsNone(data['next_cursor'])
+        self.assertIn("Whisper 1", data['html'])
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(reverse('feedback:feed_page'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
@@ -5,6 +5,7 @@ app_name = 'feedback'
 
 urlpatterns = [
     path('feed/', views.feedback_feed_view, name='feed'), 
+    path('feed/page/', views.feedback_feed_page, name='feed_page'),
     path('submit/', views.feedback_feed_view, name='submit'),
     path('like/<int:feedback_id>/', views.toggle_like, name='toggle_like'),
     path('comment/<int:feedback_id>/', views.add_comment, name='add_comment'),
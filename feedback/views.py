@@ -2,15 +2,24 @@ from typing import Set
 
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse, HttpResponseNotAllowed, HttpResponseForbidden
-from django.db import transaction
-from django.db.models import F
+from django.http import Http404, JsonResponse, HttpResponseBadRequest, HttpResponseNotAllowed, HttpResponseForbidden
+from django.template.loader import render_to_string
 
+from .feed import get_feed_page
+from .likes import toggle_feedback_like
 from .models import Feedback, FeedbackLike, FeedbackComment, FeedbackRequest
 from .forms import FeedbackForm, CommentForm
 from courses.models import Assessment
 
 
+def _liked_ids(user, feedbacks) -> Set[int]:
+    return set(
+        FeedbackLike.objects
+        .filter(user=user, feedback_id__in=[item.id for item in feedbacks])
+        .values_list('feedback_id', flat=True)
+    )
+
+
 @login_required
 def feedback_feed_view(request):
     if request.method == 'POST' and 'submit_feedback' in request.POST:
@@ -21,50 +30,61 @@ def feedback_feed_view(request):
     else:
         form = FeedbackForm()
 
-    feedbacks = (
-        Feedback.objects
-        .select_related('course')
-        .prefetch_related('comments')
-        .order_by('-created_at')
-    )
-
-    user_likes: Set[int] = set(
-        FeedbackLike.objects.filter(user=request.user).values_list('feedback_id', flat=True)
-    )
+    try:
+        feedbacks, next_cursor = get_feed_page(request.GET.get('cursor'))
+    except ValueError:
+        return HttpResponseBadRequest("Invalid cursor.")
 
     context = {
         'form': form,
         'comment_form': CommentForm(),
         'feedbacks': feedbacks,
-        'user_likes': user_likes,
+        'next_cursor': next_cursor,
+        'user_likes': _liked_ids(request.user, feedbacks),
         'page_title': 'Whisper Box Feed',
     }
     return render(request, 'feedback/feed.html', context)
 
 
+@login_required
+def feedback_feed_page(request):
+    """Infinite-scroll endpoint: the page after ?cursor= as JSON plus pre-rendered cards."""
+    try:
+        feedbacks, next_cursor = get_feed_page(request.GET.get('cursor'))
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'Invalid cursor.'}, status=400)
+
+    user_likes = _liked_ids(request.user, feedbacks)
+    items = [
+        {
+            'id': item.id,
+            'course': item.course.code if item.course else None,
+            'feedback_text': item.feedback_text,
+            'created_at': item.created_at.isoformat(),
+            'likes_count': item.likes_count,
+            'liked': item.id in user_likes,
+            'comment_count': item.comment_count,
+            'comments': [comment.comment_text for comment in item.recent_comments],
+        }
+        for item in feedbacks
+    ]
+    html = render_to_string(
+        'feedback/_feed_items.html', {'feedbacks': feedbacks, 'user_likes': user_likes}, request=request
+    )
+    return JsonResponse({'status': 'success', 'items': items, 'html': html, 'next_cursor': next_cursor})
+
+
 @login_required
 def toggle_like(request, feedback_id):
     if request.method != 'POST':
         return HttpResponseNotAllowed(['POST'])
 
-    feedback = get_object_or_404(Feedback, id=feedback_id)
+    result = toggle_feedback_like(request.user.id, feedback_id)
+    if result is None:
+        raise Http404("Feedback not found.")
 
-    with transaction.atomic():
-        like_obj, created = FeedbackLike.objects.select_for_update().get_or_create(
-            user=request.user, feedback=feedback
-        )
-
-        if not created:
-            like_obj.delete()
-            Feedback.objects.filter(pk=feedback.pk).update(likes_count=F('likes_count') - 1)
-            feedback.refresh_from_db(fields=['likes_count'])
-            liked = False
-        else:
-            Feedback.objects.filter(pk=feedback.pk).update(likes_count=F('likes_count') + 1)
-            feedback.refresh_from_db(fields=['likes_count'])
-            liked = True
-
-    return JsonResponse({'status': 'success', 'liked': liked, 'likes_count': feedback.likes_count})
+    liked, likes_count = result
+    return JsonResponse({'status': 'success', 'liked': liked, 'likes_count': likes_count})
 
 
 @login_required
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Grade
+from .audit import SOURCE_ADMIN, audit_context
+from .models import Grade, GradeAudit
 from courses.models import Course
 
 class CourseFilter(admin.SimpleListFilter):
@@ -39,6 +40,18 @@ class GradeAdmin(admin.ModelAdmin):
         (None, {'fields': ('student', 'assessment', 'score_percentage')}),
     )
 
+    def save_model(self, request, obj, form, change):
+        with audit_context(request.user, SOURCE_ADMIN):
+            super().save_model(request, obj, form, change)
+
+    def delete_model(self, request, obj):
+        with audit_context(request.user, SOURCE_ADMIN):
+            super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        with audit_context(request.user, SOURCE_ADMIN):
+            super().delete_queryset(request, queryset)
+
     @admin.display(description='Student')
     def student_username(self, obj):
         return obj.student.username
@@ -49,4 +62,23 @@ class GradeAdmin(admin.ModelAdmin):
 
     @admin.display(description='Assessment Type')
     def assessment_type(self, obj):
-        return obj.assessment.get_type_display()
\ No newline at end of file
+        return obj.assessment.get_type_display()
+
+
+@admin.register(GradeAudit)
+class GradeAuditAdmin(admin.ModelAdmin):
+    list_display = ('timestamp', 'action', 'student', 'assessment', 'old_score', 'new_score', 'changed_by', 'source')
+    list_filter = ('action', 'source')
+    search_fields = ('student__username', 'assessment__course__code', 'changed_by__username')
+    list_select_related = ('student', 'assessment__course', 'changed_by')
+    date_hierarchy = 'timestamp'
+
+    # The trail is append-only.
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -6,7 +6,4 @@ class GradesConfig(AppConfig):
     name = 'grades'
 
     def ready(self):
-        try:
-            import grades.signals
-        except ImportError:
-            pass
+        import grades.receivers
@@ -0,0 +1,90 @@
+from decimal import Decimal
+
+from django.utils import timezone
+
+from Acumie.cache import bump_version
+from courses.models import Assessment
+from .audit import GradeAuditWriter, current_audit_writer
+from .models import Grade
+from .snapshots import refresh_course_grade_snapshots
+from .stats import grade_stats_namespace
+from .utils import po_scores_namespace
+
+GRADE_BATCH_SIZE = 500
+# Grade.score_percentage has two decimal places; SQLite would store (and SQL
+# aggregates would sum) any extra digits, while the ORM reads back the rounded value.
+SCORE_QUANTUM = Decimal("0.01")
+
+
+def load_grades(keys):
+    """Existing grades for (student_id, assessment_id) keys, in one query."""
+    keys = set(keys)
+    if not keys:
+        return {}
+    student_ids = {s for s, _ in keys}
+    assessment_ids = {a for _, a in keys}
+    return {
+        (g.student_id, g.assessment_id): g
+        for g in Grade.objects.filter(student_id__in=student_ids, assessment_id__in=assessment_ids)
+        if (g.student_id, g.assessment_id) in keys
+    }
+
+
+def upsert_grades(scores, existing=None, batch_size=GRADE_BATCH_SIZE, audit=None):
+    """
+    Write {(student_id, assessment_id): score} with set-based statements:
+    missing rows go through bulk_create, rows whose score actually differs
+    through bulk_update, unchanged rows are not touched at all. Scores are
+    quantized to the field's two decimal places before they are compared.
+
+    `existing` may carry grades the caller already loaded (it is updated in
+    place with created rows); otherwise they are fetched in one query.
+    Bulk writes bypass model signals, so the affected course grade snapshots
+    are refreshed and the students' cached PO scores and the courses' grade
+    statistics invalidated here.
+    Changes are written to the audit trail through `audit` (default: the
+    active audit_context's writer) with old scores taken from the loaded
+    rows. Call inside transaction.atomic().
+    Returns (created, updated) lists of Grade instances.
+    """
+    if not scores:
+        return [], []
+    if existing is None:
+        existing = load_grades(scores)
+
+    created, updated, previous = [], [], []
+    now = timezone.now()
+    for (student_id, assessment_id), score in scores.items():
+        score = Decimal(score).quantize(SCORE_QUANTUM)
+        grade = existing.get((student_id, assessment_id))
+        if grade is None:
+            grade = Grade(student_id=student_id, assessment_id=assessment_id, score_percentage=score)
+            created.append(grade)
+        elif grade.score_percentage != score:
+            previous.append(grade.score_percentage)
+            grade.score_percentage = score
+            grade.updated_at = now  # bulk_update does not apply auto_now
+            updated.append(grade)
+
+    if created:
+        Grade.objects.bulk_create(created, batch_size=batch_size)
+        existing.update(((g.student_id, g.assessment_id), g) for g in created)
+    if updated:
+        Grade.objects.bulk_update(updated, ['score_percentage', 'updated_at'], batch_size=batch_size)
+
+    writer = audit or current_audit_writer() or GradeAuditWriter()
+    writer.created(created)
+    writer.updated(zip(updated, previous))
+    writer.flush()
+
+    changed = created + updated
+    if changed:
+        course_ids = dict(
+            Assessment.objects.filter(id__in={g.assessment_id for g in changed}).values_list('id', 'course_id')
+        )
+        refresh_course_grade_snapshots({(g.student_id, course_ids[g.assessment_id]) for g in changed})
+        bump_version(
+            *{po_scores_namespace(g.student_id) for g in changed},
+            *{grade_stats_namespace(course_id) for course_id in course_ids.values()},
+        )
+    return created, updated
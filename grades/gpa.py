@@ -0,0 +1,90 @@
+"""
+Batch 4-scale conversion.
+
+Vectorised equivalent of grades.utils.get_4_scale_point for many scores at
+once: points are computed as hundredths, 100 * (0.05 * score - 1.00) =
+5 * score - 100, clamped to [0, 400] and rounded half to even like the
+scalar's Decimal quantize. Float arithmetic is exact enough to decide every
+rounding except a value sitting on (or within float error of) a .5 tie, so
+those few scores, and anything that is not a finite number, are passed to
+the scalar function itself. Results are returned from POINTS, a table of the
+401 Decimals the scalar can produce, so no Decimal is built per score.
+
+ECTS-weighted GPAs are summed as integers in hundredths and divided once
+per student, giving the same value grade_dashboard_view's Decimal loop does.
+"""
+from decimal import Decimal
+
+import numpy as np
+
+from .utils import get_4_scale_point
+
+# POINTS[c] is get_4_scale_point of a score mapping exactly to c hundredths.
+POINTS = tuple(get_4_scale_point(Decimal(20) + Decimal(c) / 5) for c in range(401))
+_TIE_TOLERANCE = 1e-6
+
+
+def _hundredths(values):
+    # Credits and points are stored with two decimals, so scaling by 100 and
+    # rounding recovers them exactly.
+    values = np.fromiter((float(v) for v in values), dtype=np.float64)
+    return np.rint(values * 100).astype(np.int64)
+
+
+def four_scale_cents(scores):
+    """get_4_scale_point of every score, as an int64 array of hundredths of a point."""
+    scores = list(scores)
+    try:
+        x = np.fromiter((float(s) for s in scores), dtype=np.float64, count=len(scores))
+    except (TypeError, ValueError):
+        return np.array([POINTS.index(get_4_scale_point(s)) for s in scores], dtype=np.int64)
+
+    hundredths = np.clip(5.0 * x - 100.0, 0.0, 400.0)
+    unsure = ~np.isfinite(hundredths) | (np.abs(hundredths - np.floor(hundredths) - 0.5) < _TIE_TOLERANCE)
+    cents = np.floor(np.where(unsure, 0.0, hundredths) + 0.5).astype(np.int64)
+    for i in np.flatnonzero(unsure):
+        cents[i] = POINTS.index(get_4_scale_point(scores[i]))
+    return cents
+
+
+def four_scale_points(scores):
+    """[get_4_scale_point(s) for s in scores], without building a Decimal per score."""
+    return [POINTS[c] for c in four_scale_cents(scores).tolist()]
+
+
+def _gpa(weighted, credits):
+    # Same operands and exponents as summing point * ects and ects in Decimal.
+    return Decimal(weighted).scaleb(-4) / Decimal(credits).scaleb(-2)
+
+
+def weighted_gpas(student_ids, point_cents, ects):
+    """
+    ECTS-weighted GPA per student from parallel sequences with one entry per
+    course taken: student id, 4-scale point in hundredths (four_scale_cents)
+    and ECTS credit. Returns {student_id: Decimal}; students whose courses
+    carry no credits are left out.
+    """
+    student_ids = np.asarray(student_ids, dtype=np.int64)
+    if not student_ids.size:
+        return {}
+    students, pos = np.unique(student_ids, return_inverse=True)
+    credits = _hundredths(ects)
+    weighted = np.zeros(len(students), dtype=np.int64)
+    total = np.zeros(len(students), dtype=np.int64)
+    np.add.at(weighted, pos, np.asarray(point_cents, dtype=np.int64) * credits)
+    np.add.at(total, pos, credits)
+    return {
+        sid: _gpa(w, t)
+        for sid, w, t in zip(students.tolist(), weighted.tolist(), total.tolist())
+        if t
+    }
+
+
+def transcript(scores, ects):
+    """
+    4-scale points of one student's course scores and their ECTS-weighted
+    GPA: (points, gpa), with gpa None when the courses carry no credits.
+    """
+    cents = four_scale_cents(scores)
+    gpa = weighted_gpas(np.zeros(len(cents), dtype=np.int64), cents, ects).get(0)
+    return [POINTS[c] for c in cents.tolist()], gpa
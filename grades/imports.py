@@ -0,0 +1,131 @@
+import codecs
+import csv
+from decimal import Decimal, InvalidOperation
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from .audit import SOURCE_CSV, audit_context
+from .bulk import upsert_grades
+
+GRADE_IMPORT_BATCH_SIZE = 2000
+
+
+class GradeImportReport:
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.errors = []
+        self.row_errors = 0
+
+    def error(self, line, message):
+        """A counted row that could not be imported."""
+        self.errors.append((line, message))
+        self.row_errors += 1
+
+    def file_error(self, line, message):
+        """A read error that ends the import; it belongs to no counted row."""
+        self.errors.append((line, message))
+
+    @property
+    def unchanged(self):
+        return self.rows - self.created - self.updated - self.row_errors
+
+    def as_dict(self, max_errors=None):
+        return {
+            "rows": self.rows,
+            "created": self.created,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "error_count": len(self.errors),
+            "errors": [{"line": line, "message": message} for line, message in self.errors[:max_errors]],
+        }
+
+
+def _parse_row(row, assessment_ids):
+    username = (row.get("username") or row.get("student_username") or "").strip()
+    assessment_raw = (row.get("assessment_id") or "").strip()
+    score_raw = (row.get("score") or row.get("score_percentage") or "").strip()
+    if not (username and assessment_raw and score_raw):
+        raise ValueError("missing username, assessment_id or score.")
+    try:
+        assessment_id = int(assessment_raw)
+    except ValueError:
+        raise ValueError(f"invalid assessment_id ({assessment_raw}).")
+    if assessment_id not in assessment_ids:
+        raise ValueError(f"assessment {assessment_id} does not belong to this course.")
+    try:
+        score = Decimal(score_raw)
+    except InvalidOperation:
+        raise ValueError(f"invalid score ({score_raw}).")
+    if not score.is_finite() or score < 0 or score > 100:
+        raise ValueError(f"score must be between 0 and 100 ({score_raw}).")
+    if score.as_tuple().exponent < -2:
+        raise ValueError(f"score must have at most two decimal places ({score_raw}).")
+    return username, assessment_id, score
+
+
+def _flush(batch, report):
+    User = get_user_model()
+    user_ids = dict(
+        User.objects.filter(username__in={username for _, username, _, _ in batch}).values_list("username", "id")
+    )
+    scores = {}
+    for line, username, assessment_id, score in batch:
+        student_id = user_ids.get(username)
+        if student_id is None:
+            report.error(line, f"student not found ({username}).")
+            continue
+        # A later line for the same cell wins; the earlier one counts as unchanged.
+        scores[(student_id, assessment_id)] = score
+    created, updated = upsert_grades(scores)
+    report.created += len(created)
+    report.updated += len(updated)
+
+
+def import_grade_csv(fileobj, course, batch_size=GRADE_IMPORT_BATCH_SIZE, progress=None, changed_by=None):
+    """
+    Stream a grade CSV (columns: username, assessment_id, score) into `course`.
+
+    `fileobj` is any binary file-like object yielding lines, e.g. an
+    UploadedFile. Rows are read incrementally and resolved/written one batch
+    at a time (one username IN query plus the upsert statements per batch), so
+    memory is bounded by `batch_size`. Bad lines are collected in the returned
+    GradeImportReport instead of aborting the import. Changes are audited as a
+    CSV import by `changed_by`.
+
+    Each batch commits in its own transaction, and `progress`, if given, is
+    called with the number of rows read after that commit, so a job's
+    progress is visible to other connections while the import runs. An error
+    that aborts the import keeps the batches already committed; re-running
+    the file is safe, since unchanged scores are not written again.
+    """
+    report = GradeImportReport()
+    assessment_ids = set(course.assessments.values_list("id", flat=True))
+    reader = csv.DictReader(codecs.iterdecode(fileobj, "utf-8-sig"))
+    batch = []
+    with audit_context(changed_by, SOURCE_CSV):
+        try:
+            for row in reader:
+                report.rows += 1
+                try:
+                    batch.append((reader.line_num, *_parse_row(row, assessment_ids)))
+                except ValueError as e:
+                    report.error(reader.line_num, str(e))
+                    continue
+                if len(batch) >= batch_size:
+                    with transaction.atomic():
+                        _flush(batch, report)
+                    batch = []
+                    if progress:
+                        progress(report.rows)
+        except (UnicodeDecodeError, csv.Error) as e:
+            report.file_error(reader.line_num + 1, f"could not read file: {e}")
+        if batch:
+            with transaction.atomic():
+                _flush(batch, report)
+    if progress:
+        progress(report.rows)
+    report.errors.sort()
+    return report
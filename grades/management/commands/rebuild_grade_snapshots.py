@@ -0,0 +1,15 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from grades.snapshots import rebuild_all_course_grade_snapshots
+
+
+class Command(BaseCommand):
+    help = "Recompute every CourseGradeSnapshot row from the grade table."
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = rebuild_all_course_grade_snapshots()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} course grade snapshot(s) in {elapsed:.2f}s."))
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0009_alter_assessment_learning_outcomes'),
+        ('grades', '0002_alter_coursegrade_unique_together_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseGradeSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weighted_score', models.DecimalField(decimal_places=6, default=0, max_digits=9, verbose_name='Weighted Score (%)')),
+                ('point', models.DecimalField(decimal_places=2, default=0, max_digits=3, verbose_name='Grade Point (4.00 scale)')),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='grade_snapshots', to='courses.course', verbose_name='Course')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='course_grade_snapshots', to=settings.AUTH_USER_MODEL, verbose_name='Student')),
+            ],
+            options={
+                'verbose_name': 'Course Grade Snapshot',
+                'verbose_name_plural': 'Course Grade Snapshots',
+                'unique_together': {('student', 'course')},
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:48
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0009_alter_assessment_learning_outcomes'),
+        ('grades', '0003_coursegradesnapshot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradeAudit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(choices=[('CREATE', 'Created'), ('UPDATE', 'Updated'), ('DELETE', 'Deleted')], max_length=10, verbose_name='Action')),
+                ('old_score', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True, verbose_name='Old Score (%)')),
+                ('new_score', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True, verbose_name='New Score (%)')),
+                ('source', models.CharField(blank=True, max_length=20, verbose_name='Source')),
+                ('timestamp', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Timestamp')),
+                ('assessment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='grade_audit_entries', to='courses.assessment', verbose_name='Assessment')),
+                ('changed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Changed By')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='grade_audit_entries', to=settings.AUTH_USER_MODEL, verbose_name='Student')),
+            ],
+            options={
+                'verbose_name': 'Grade Audit Entry',
+                'verbose_name_plural': 'Grade Audit Entries',
+                'ordering': ['-timestamp', '-id'],
+            },
+        ),
+    ]
@@ -1,7 +1,8 @@
 from django.db import models
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
-from courses.models import Assessment
+from django.utils import timezone
+from courses.models import Assessment, Course
 from accounts.models import UserRole
 
 class Grade(models.Model):
@@ -25,6 +26,7 @@ class Grade(models.Model):
         verbose_name="Score (%)",
         help_text="Student's score for this assessment (0-100)."
     )
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Last Modified")
 
     class Meta:
         verbose_name = "Grade"
@@ -32,4 +34,99 @@ class Grade(models.Model):
         unique_together = ('student', 'assessment')
 
     def __str__(self):
-        return f"{self.student.username} - {self.assessment} - {self.score_percentage}"
\ No newline at end of file
+        return f"{self.student.username} - {self.assessment} - {self.score_percentage}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored score so the audit trail can record the old value without re-reading it.
+        instance._loaded_score = instance.__dict__.get('score_percentage')
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        # refresh_from_db copies values onto this instance without going through from_db.
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        if fields is None or 'score_percentage' in fields:
+            self._loaded_score = self.__dict__.get('score_percentage')
+
+class CourseGradeSnapshot(models.Model):
+    """Materialized weighted course grade of one student, kept current by grades.receivers."""
+    student = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='course_grade_snapshots',
+        verbose_name="Student"
+    )
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name='grade_snapshots',
+        verbose_name="Course"
+    )
+    weighted_score = models.DecimalField(
+        max_digits=9,
+        decimal_places=6,
+        default=0,
+        verbose_name="Weighted Score (%)"
+    )
+    point = models.DecimalField(
+        max_digits=3,
+        decimal_places=2,
+        default=0,
+        verbose_name="Grade Point (4.00 scale)"
+    )
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Course Grade Snapshot"
+        verbose_name_plural = "Course Grade Snapshots"
+        unique_together = ('student', 'course')
+
+    def __str__(self):
+        return f"{self.student_id} - {self.course_id} - {self.weighted_score}"
+
+
+class GradeAudit(models.Model):
+    """Append-only record of one grade change, written in batches by grades.audit."""
+    ACTION_CREATE = 'CREATE'
+    ACTION_UPDATE = 'UPDATE'
+    ACTION_DELETE = 'DELETE'
+    ACTIONS = [
+        (ACTION_CREATE, 'Created'),
+        (ACTION_UPDATE, 'Updated'),
+        (ACTION_DELETE, 'Deleted'),
+    ]
+
+    student = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='grade_audit_entries',
+        verbose_name="Student"
+    )
+    assessment = models.ForeignKey(
+        Assessment,
+        on_delete=models.CASCADE,
+        related_name='grade_audit_entries',
+        verbose_name="Assessment"
+    )
+    action = models.CharField(max_length=10, choices=ACTIONS, verbose_name="Action")
+    old_score = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True, verbose_name="Old Score (%)")
+    new_score = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True, verbose_name="New Score (%)")
+    changed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name="Changed By"
+    )
+    source = models.CharField(max_length=20, blank=True, verbose_name="Source")
+    timestamp = models.DateTimeField(default=timezone.now, db_index=True, verbose_name="Timestamp")
+
+    class Meta:
+        verbose_name = "Grade Audit Entry"
+        verbose_name_plural = "Grade Audit Entries"
+        ordering = ['-timestamp', '-id']
+
+    def __str__(self):
+        return f"{self.get_action_display()} {self.student_id}/{self.assessment_id}: {self.old_score} -> {self.new_score}"
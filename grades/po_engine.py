@@ -0,0 +1,80 @@
+"""
+Batch program-outcome attainment.
+
+Computes the same PO scores as grades.utils.calculate_weighted_po_score for a
+whole cohort at once: the outcomes.AssessmentPOWeight index is loaded a single
+time into a dense assessment x PO weight matrix W, so that for the score matrix
+S (students x assessments, score ratio, 0 when ungraded) and the mask M
+(1 where a grade exists):
+
+    earned = S @ W,  possible = M @ W,  score = earned / possible * 100
+"""
+import numpy as np
+
+from outcomes.models import AssessmentPOWeight
+from .models import Grade
+
+DEFAULT_STUDENT_CHUNK = 2000
+
+
+def build_assessment_po_matrix():
+    """
+    Returns (assessment_index, po_codes, weights, links) where assessment_index
+    maps assessment id -> row, weights is the W matrix and links marks the
+    cells backed by an index row (a PO is reported once any such cell is graded).
+    """
+    rows = list(AssessmentPOWeight.objects.values_list('assessment_id', 'program_outcome__code', 'effective_weight'))
+    po_codes = sorted({code for _, code, _ in rows})
+    po_index = {code: i for i, code in enumerate(po_codes)}
+    assessment_index = {a_id: i for i, a_id in enumerate(sorted({a_id for a_id, _, _ in rows}))}
+
+    weights = np.zeros((len(assessment_index), len(po_codes)))
+    links = np.zeros_like(weights)
+    for a_id, code, weight in rows:
+        weights[assessment_index[a_id], po_index[code]] = float(weight)
+        links[assessment_index[a_id], po_index[code]] = 1.0
+    return assessment_index, po_codes, weights, links
+
+
+def calculate_po_scores(student_ids=None, chunk_size=DEFAULT_STUDENT_CHUNK):
+    """
+    PO scores for many students, keyed by student id then PO code. Scores are
+    floats rounded to two decimals; students without mapped grades are omitted.
+    """
+    assessment_index, po_codes, weights, links = build_assessment_po_matrix()
+    if not assessment_index:
+        return {}
+
+    grades = Grade.objects.filter(assessment_id__in=list(assessment_index))
+    if student_ids is not None:
+        grades = grades.filter(student_id__in=list(student_ids))
+    rows = list(grades.order_by().values_list('student_id', 'assessment_id', 'score_percentage'))
+    if not rows:
+        return {}
+
+    student_col = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+    assessment_col = np.fromiter((assessment_index[r[1]] for r in rows), dtype=np.int64, count=len(rows))
+    score_col = np.fromiter((float(r[2]) / 100.0 for r in rows), dtype=np.float64, count=len(rows))
+    students, student_pos = np.unique(student_col, return_inverse=True)
+
+    results = {}
+    for start in range(0, len(students), chunk_size):
+        stop = min(start + chunk_size, len(students))
+        in_chunk = (student_pos >= start) & (student_pos < stop)
+        local = student_pos[in_chunk] - start
+        scores = np.zeros((stop - start, len(assessment_index)))
+        mask = np.zeros_like(scores)
+        scores[local, assessment_col[in_chunk]] = score_col[in_chunk]
+        mask[local, assessment_col[in_chunk]] = 1.0
+
+        earned = scores @ weights
+        possible = mask @ weights
+        present = (mask @ links) > 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(possible > 0, np.round(earned / possible * 100.0, 2), 0.0)
+
+        for offset, student_id in enumerate(students[start:stop]):
+            cols = np.flatnonzero(present[offset])
+            if len(cols):
+                results[int(student_id)] = {po_codes[c]: float(ratio[offset, c]) for c in cols}
+    return results
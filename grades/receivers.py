@@ -0,0 +1,119 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from Acumie.cache import bump_version, invalidate_on
+from courses.models import Assessment, Course
+from outcomes.models import ProgramOutcome
+from outcomes.weights import PO_MAPPING_NAMESPACE
+from .audit import GradeAuditWriter, current_audit_writer
+from .models import Grade, GradeAudit
+from .snapshots import refresh_course_grade_snapshots, refresh_course_snapshots
+from .stats import grade_stats_namespace
+from .utils import po_scores_namespace
+
+
+def _origin_model(origin):
+    return origin.model if isinstance(origin, QuerySet) else type(origin)
+
+
+@receiver(post_save, sender=Grade)
+def grade_saved_refresh_snapshot(sender, instance: Grade, **kwargs):
+    refresh_course_grade_snapshots([(instance.student_id, instance.assessment.course_id)])
+
+
+@receiver(post_delete, sender=Grade)
+def grade_deleted_refresh_snapshot(sender, instance: Grade, origin=None, **kwargs):
+    # Cascades from an assessment are refreshed once per course by its own handler;
+    # cascades from a student or course remove the snapshot rows themselves.
+    if origin is not None and _origin_model(origin) is not Grade:
+        return
+    refresh_course_grade_snapshots([(instance.student_id, instance.assessment.course_id)])
+
+
+@receiver(post_save, sender=Assessment)
+def assessment_saved_refresh_snapshots(sender, instance: Assessment, created: bool, **kwargs):
+    # A new assessment has no grades yet, so no course total can have moved.
+    if created:
+        return
+    refresh_course_snapshots(instance.course_id)
+
+
+@receiver(post_delete, sender=Assessment)
+def assessment_deleted_refresh_snapshots(sender, instance: Assessment, origin=None, **kwargs):
+    if origin is not None and _origin_model(origin) is not Assessment:
+        return
+    refresh_course_snapshots(instance.course_id)
+
+
+@receiver(post_save, sender=Grade)
+@receiver(post_delete, sender=Grade)
+def grade_changed_invalidate_po_scores(sender, instance: Grade, origin=None, **kwargs):
+    # Assessment and course deletes bump the mapping version once instead.
+    if origin is not None and _origin_model(origin) in (Assessment, Course):
+        return
+    bump_version(po_scores_namespace(instance.student_id))
+
+
+# ALO, LO->PO, assessment weight and ECTS edits all go through
+# outcomes.weights.rebuild_assessment_po_weights, which bumps the mapping
+# version; a deleted assessment drops its index rows by cascade instead,
+# and PO codes are the keys of the cached result.
+@receiver(post_delete, sender=Assessment)
+def assessment_deleted_invalidate_po_scores(sender, instance: Assessment, origin=None, **kwargs):
+    if origin is not None and _origin_model(origin) is not Assessment:
+        return
+    bump_version(PO_MAPPING_NAMESPACE)
+
+
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=ProgramOutcome)
+@receiver(post_delete, sender=ProgramOutcome)
+def mapping_changed_invalidate_po_scores(sender, **kwargs):
+    bump_version(PO_MAPPING_NAMESPACE)
+
+
+# Cached grade statistics are per course; bulk writes bump them in grades.bulk.
+# Deletes cascading from an assessment are covered by the assessment's own bump.
+invalidate_on(
+    Grade,
+    lambda grade: grade_stats_namespace(grade.assessment.course_id),
+    skip_cascade_from=(Assessment, Course),
+)
+invalidate_on(
+    Assessment,
+    lambda assessment: grade_stats_namespace(assessment.course_id),
+    skip_cascade_from=(Course,),
+)
+
+
+def _record_audit(instance, action, old_score, new_score):
+    # Inside an audit_context the row joins its buffer; otherwise (or when the
+    # caller attributed this save via instance._changed_by) it is written now.
+    writer = current_audit_writer()
+    changed_by = getattr(instance, "_changed_by", None)
+    if writer is not None and changed_by is None:
+        writer.record(instance, action, old_score, new_score)
+        return
+    with GradeAuditWriter(changed_by=changed_by, source=getattr(writer, "source", "")) as own:
+        own.record(instance, action, old_score, new_score)
+
+
+@receiver(post_save, sender=Grade)
+def grade_saved_audit(sender, instance: Grade, created: bool, raw=False, **kwargs):
+    if raw:
+        return
+    old_score = None if created else getattr(instance, "_loaded_score", None)
+    if not created and old_score == instance.score_percentage:
+        return
+    action = GradeAudit.ACTION_CREATE if created else GradeAudit.ACTION_UPDATE
+    _record_audit(instance, action, old_score, instance.score_percentage)
+    instance._loaded_score = instance.score_percentage
+
+
+@receiver(post_delete, sender=Grade)
+def grade_deleted_audit(sender, instance: Grade, origin=None, **kwargs):
+    # Grades removed with their student, assessment or course take their audit rows with them.
+    if origin is not None and _origin_model(origin) is not Grade:
+        return
+    _record_audit(instance, GradeAudit.ACTION_DELETE, instance.score_percentage, None)
@@ -0,0 +1,101 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+
+from courses.models import Enrollment
+from .gpa import four_scale_points
+from .models import CourseGradeSnapshot
+from .utils import (
+    calculate_all_course_grades,
+    calculate_course_grades_for_course,
+)
+
+SNAPSHOT_BATCH_SIZE = 1000
+
+
+def _snapshots(rows):
+    """CourseGradeSnapshot objects for (student_id, course_id, weighted_score) rows."""
+    rows = list(rows)
+    points = four_scale_points(score for _, _, score in rows)
+    return [
+        CourseGradeSnapshot(student_id=sid, course_id=cid, weighted_score=score, point=point)
+        for (sid, cid, score), point in zip(rows, points)
+    ]
+
+
+def _upsert(snapshots):
+    CourseGradeSnapshot.objects.bulk_create(
+        snapshots,
+        batch_size=SNAPSHOT_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['student', 'course'],
+        update_fields=['weighted_score', 'point', 'computed_at'],
+    )
+
+
+def store_course_grade_snapshots(rows):
+    """Upsert snapshots for (student_id, course_id, weighted_score) rows; returns them."""
+    snapshots = _snapshots(rows)
+    if snapshots:
+        _upsert(snapshots)
+    return snapshots
+
+
+def refresh_course_grade_snapshots(pairs):
+    """
+    Recompute the snapshots of the given (student_id, course_id) pairs.
+    Costs one aggregate query per distinct course plus one upsert.
+    """
+    students_by_course = defaultdict(set)
+    for student_id, course_id in pairs:
+        students_by_course[course_id].add(student_id)
+    rows = []
+    for course_id, student_ids in students_by_course.items():
+        scores = calculate_course_grades_for_course(course_id, students=student_ids)
+        rows.extend((sid, course_id, score) for sid, score in scores.items())
+    return store_course_grade_snapshots(rows)
+
+
+def refresh_course_snapshots(course_id):
+    """Recompute every snapshot of one course, e.g. after an assessment weight change."""
+    student_ids = set(
+        Enrollment.objects.filter(course_id=course_id).values_list('student_id', flat=True)
+    )
+    student_ids.update(
+        CourseGradeSnapshot.objects.filter(course_id=course_id).values_list('student_id', flat=True)
+    )
+    scores = calculate_course_grades_for_course(course_id)
+    student_ids.update(scores)
+    return store_course_grade_snapshots((sid, course_id, scores.get(sid, Decimal("0.00"))) for sid in student_ids)
+
+
+def rebuild_all_course_grade_snapshots():
+    """Drop and recreate every snapshot from the grade table; returns the row count."""
+    scores = calculate_all_course_grades()
+    pairs = set(scores)
+    pairs.update(Enrollment.objects.values_list('student_id', 'course_id'))
+    with transaction.atomic():
+        CourseGradeSnapshot.objects.all().delete()
+        CourseGradeSnapshot.objects.bulk_create(
+            _snapshots((sid, cid, scores.get((sid, cid), Decimal("0.00"))) for sid, cid in pairs),
+            batch_size=SNAPSHOT_BATCH_SIZE,
+        )
+    return len(pairs)
+
+
+def get_course_grade_snapshots(student, courses):
+    """
+    Snapshots of `student` for `courses`, keyed by course id. Pairs that were
+    never materialized (e.g. a fresh enrollment) are computed and stored on the fly.
+    """
+    course_ids = [getattr(c, "pk", c) for c in courses]
+    snapshots = {
+        snap.course_id: snap
+        for snap in CourseGradeSnapshot.objects.filter(student=student, course_id__in=course_ids)
+    }
+    missing = [(student.pk, cid) for cid in course_ids if cid not in snapshots]
+    if missing:
+        for snap in refresh_course_grade_snapshots(missing):
+            snapshots[snap.course_id] = snap
+    return snapshots
@@ -0,0 +1,115 @@
+"""
+Score distributions per assessment and per course.
+
+The database does what it can aggregate exactly: count / mean / min / max
+per assessment in one grouped query, and each student's weighted course
+total (grades.utils._weighted_course_totals). Median, standard deviation,
+percentiles and histograms need the whole distribution, so the scores are
+read once with values_list into NumPy arrays and summarised there.
+
+Grades still at the 0.00 placeholder the entry grid creates are treated as
+ungraded, as on the teacher dashboard. Results are cached per course under
+grade_stats_namespace(), bumped by grades.receivers and grades.bulk.
+"""
+import numpy as np
+from django.conf import settings
+from django.db.models import Avg, Count, Max, Min
+
+from Acumie.cache import get_or_compute
+from courses.models import Assessment
+from .models import Grade
+from .utils import _weighted_course_totals
+
+HISTOGRAM_BINS = 10
+PERCENTILES = (10, 25, 75, 90)
+
+
+def grade_stats_namespace(course_id):
+    return f"grade-stats:course:{course_id}"
+
+
+def _round(value):
+    return None if value is None else round(float(value), 2)
+
+
+def describe(values, mean=None):
+    """
+    Summary of a sequence of 0-100 scores: count, mean, median, population
+    standard deviation, min, max, PERCENTILES and a HISTOGRAM_BINS-bin
+    histogram over [0, 100] (the last bin includes 100). Pass `mean` to
+    report an exactly aggregated mean instead of the float one.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    counts, edges = np.histogram(values, bins=HISTOGRAM_BINS, range=(0.0, 100.0))
+    histogram = {"edges": [_round(edge) for edge in edges], "counts": counts.tolist()}
+    if not values.size:
+        return {
+            "count": 0, "mean": None, "median": None, "std": None, "min": None, "max": None,
+            "percentiles": {f"p{p}": None for p in PERCENTILES}, "histogram": histogram,
+        }
+    return {
+        "count": int(values.size),
+        "mean": _round(values.mean() if mean is None else mean),
+        "median": _round(np.median(values)),
+        "std": _round(values.std()),
+        "min": _round(values.min()),
+        "max": _round(values.max()),
+        "percentiles": {f"p{p}": _round(v) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))},
+        "histogram": histogram,
+    }
+
+
+def assessment_statistics(course_id):
+    """describe() of every assessment of the course, keyed by assessment id, in two queries."""
+    graded = Grade.objects.filter(assessment__course_id=course_id).exclude(score_percentage=0).order_by()
+    aggregates = {
+        row["assessment_id"]: row
+        for row in graded.values("assessment_id").annotate(
+            n=Count("id"), mean=Avg("score_percentage"), low=Min("score_percentage"), high=Max("score_percentage"),
+        )
+    }
+    rows = list(graded.values_list("assessment_id", "score_percentage"))
+    ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+    scores = np.fromiter((float(r[1]) for r in rows), dtype=np.float64, count=len(rows))
+
+    stats = {}
+    for assessment_id, row in aggregates.items():
+        stats[assessment_id] = describe(scores[ids == assessment_id], mean=row["mean"])
+        stats[assessment_id].update(count=row["n"], min=_round(row["low"]), max=_round(row["high"]))
+    return stats
+
+
+def course_statistics(course_id):
+    """describe() of the weighted course totals of every student with at least one real grade."""
+    graded = Grade.objects.filter(assessment__course_id=course_id).exclude(score_percentage=0)
+    totals = _weighted_course_totals(graded, "student_id")
+    return describe(list(totals.values()))
+
+
+def compute_course_grade_statistics(course_id):
+    by_assessment = assessment_statistics(course_id)
+    assessments = Assessment.objects.filter(course_id=course_id).order_by("type", "id")
+    return {
+        "course": course_statistics(course_id),
+        "assessments": [
+            {
+                "id": assessment.id,
+                "type": assessment.type,
+                "label": assessment.name or assessment.get_type_display(),
+                "weight": str(assessment.weight_percentage),
+                **by_assessment.get(assessment.id, describe([])),
+            }
+            for assessment in assessments
+        ],
+    }
+
+
+def course_grade_statistics(course_id):
+    """compute_course_grade_statistics, cached until a grade or assessment of the course changes."""
+    return get_or_compute(
+        grade_stats_namespace(course_id),
+        [],
+        lambda: compute_course_grade_statistics(course_id),
+        timeout=getattr(settings, "GRADE_STATS_CACHE_TIMEOUT", 60 * 60),
+        label="grade-stats",
+    )
@@ -0,0 +1,37 @@
+from pathlib import Path
+
+from django.conf import settings
+
+from courses.models import Course
+from jobs.registry import register
+from jobs.runner import discard_spooled_file
+from .imports import import_grade_csv
+from .transcripts import run_transcripts
+
+MAX_REPORTED_ERRORS = 1000
+
+
+@register("grades.import_csv")
+def import_grade_csv_job(job, payload):
+    course = Course.objects.get(pk=payload["course_id"])
+    try:
+        with open(payload["path"], "rb") as f:
+            report = import_grade_csv(f, course, progress=job.set_progress, changed_by=job.created_by_id)
+    finally:
+        discard_spooled_file(payload["path"])
+    return report.as_dict(max_errors=MAX_REPORTED_ERRORS)
+
+
+@register("grades.transcripts")
+def transcripts_job(job, payload):
+    spool_dir = Path(settings.JOBS_SPOOL_DIR)
+    spool_dir.mkdir(parents=True, exist_ok=True)
+    path = spool_dir / f"transcripts-{job.pk}.csv"
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        report = run_transcripts(
+            f,
+            per_course=payload.get("per_course", False),
+            update_snapshots=payload.get("update_snapshots", True),
+            progress=job.set_progress,
+        )
+    return {**report.as_dict(), "path": str(path)}
@@ -1,15 +1,56 @@
-from django.test import TestCase
+import csv
+import json
+import shutil
+import statistics
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from django.conf import settings
+from django.test import TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 
-from courses.models import Course, Assessment, Enrollment
-from .models import Grade
+from courses.models import Course, Assessment, AssessmentLearningOutcome, Enrollment
+from feedback.models import FeedbackRequest
+from jobs.models import JobStatus
+from jobs.runner import enqueue, run_pending_jobs
+from outcomes.models import LearningOutcome, LO_PO_Contribution, ProgramOutcome
+from .audit import SOURCE_CSV, SOURCE_GRADE_ENTRY, SOURCE_ADMIN, audit_context
+from .bulk import load_grades, upsert_grades
+from .export import EXPORT_COLUMNS, grade_book_rows
+from .gpa import four_scale_cents, four_scale_points, transcript, weighted_gpas
+from .imports import import_grade_csv
+from .models import Grade, GradeAudit, CourseGradeSnapshot
+from .stats import course_grade_statistics
+from .transcripts import iter_transcripts
+from .po_engine import calculate_po_scores
+from .utils import (
+    calculate_course_grade,
+    calculate_course_grades_for_course,
+    calculate_course_grades_for_student,
+    calculate_weighted_po_score,
+    cached_weighted_po_score,
+    get_4_scale_point,
+)
 
 User = get_user_model()
 
 
 class GradeDashboardViewTest(TestCase):
     def setUp(self):
+        cache.clear()
         self.user = User.objects.create_user(
             username='teststudent',
             password='testpass123',
@@ -68,3 +109,732 @@ class GradeDashboardViewTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "teststudent")
         self.assertContains(response, "CSE321")
+
+
+class CourseGradeEngineTest(TestCase):
+    def setUp(self):
+        self.student = User.objects.create_user(username='s1', password='x', role='STUDENT')
+        self.other = User.objects.create_user(username='s2', password='x', role='STUDENT')
+        self.course = Course.objects.create(code="CSE101", title="Intro", ects_credit=6)
+        self.empty_course = Course.objects.create(code="CSE102", title="Empty", ects_credit=4)
+        self.midterm = Assessment.objects.create(type="MIDTERM", course=self.course, weight_percentage=Decimal("33.33"))
+        self.final = Assessment.objects.create(type="FINAL", course=self.course, weight_percentage=Decimal("66.67"))
+        Grade.objects.create(student=self.student, assessment=self.midterm, score_percentage=Decimal("87.55"))
+        Grade.objects.create(student=self.student, assessment=self.final, score_percentage=Decimal("71.25"))
+        Grade.objects.create(student=self.other, assessment=self.midterm, score_percentage=Decimal("50.00"))
+
+    def test_student_grades_match_per_assessment_formula(self):
+        with self.assertNumQueries(1):
+            grades = calculate_course_grades_for_student(self.student, [self.course, self.empty_course])
+        expected = Decimal("87.55") * Decimal("0.3333") + Decimal("71.25") * Decimal("0.6667")
+        self.assertEqual(grades[self.course.pk], expected)
+        self.assertEqual(grades[self.empty_course.pk], Decimal("0.00"))
+        self.assertEqual(calculate_course_grade(self.student, self.course), expected)
+
+    def test_course_grades_cover_every_student(self):
+        with self.assertNumQueries(1):
+            grades = calculate_course_grades_for_course(self.course)
+        self.assertEqual(grades[self.other.pk], Decimal("50.00") * Decimal("0.3333"))
+        self.assertEqual(grades[self.student.pk], calculate_course_grade(self.student, self.course))
+
+
+class CourseGradeSnapshotTest(TestCase):
+    def setUp(self):
+        self.student = User.objects.create_user(username='s1', password='x', role='STUDENT')
+        self.course = Course.objects.create(code="CSE201", title="Data Structures", ects_credit=5)
+        Enrollment.objects.create(student=self.student, course=self.course)
+        self.midterm = Assessment.objects.create(type="MIDTERM", course=self.course, weight_percentage=40)
+        self.final = Assessment.objects.create(type="FINAL", course=self.course, weight_percentage=60)
+
+    def snapshot(self):
+        return CourseGradeSnapshot.objects.get(student=self.student, course=self.course)
+
+    def test_grade_changes_refresh_snapshot(self):
+        grade = Grade.objects.create(student=self.student, assessment=self.midterm, score_percentage=80)
+        self.assertEqual(self.snapshot().weighted_score, Decimal("32"))
+        self.assertEqual(self.snapshot().point, get_4_scale_point(Decimal("32")))
+
+        Grade.objects.create(student=self.student, assessment=self.final, score_percentage=90)
+        self.assertEqual(self.snapshot().weighted_score, Decimal("86"))
+
+        grade.delete()
+        self.assertEqual(self.snapshot().weighted_score, Decimal("54"))
+
+    def test_weight_change_refreshes_course(self):
+        Grade.objects.create(student=self.student, assessment=self.midterm, score_percentage=50)
+        self.midterm.weight_percentage = 20
+        self.midterm.save()
+        self.assertEqual(self.snapshot().weighted_score, Decimal("10"))
+
+        self.midterm.delete()
+        self.assertEqual(self.snapshot().weighted_score, Decimal("0"))
+
+    def test_rebuild_command(self):
+        Grade.objects.create(student=self.student, assessment=self.final, score_percentage=70)
+        CourseGradeSnapshot.objects.all().delete()
+        call_command('rebuild_grade_snapshots', stdout=StringIO())
+        self.assertEqual(self.snapshot().weighted_score, Decimal("42"))
+
+
+class POCurriculumMixin:
+    def build_curriculum(self):
+        self.students = [
+            User.objects.create_user(username=f's{i}', password='x', role='STUDENT') for i in range(3)
+        ]
+        po1 = ProgramOutcome.objects.create(code="PO1", title="Analysis")
+        po2 = ProgramOutcome.objects.create(code="PO2", title="Design")
+        for code, ects, scores in (("CSE301", 5, (91, 47, 66)), ("CSE302", 7, (58, 83, 100))):
+            course = Course.objects.create(code=code, title=code, ects_credit=ects)
+            lo_a = LearningOutcome.objects.create(course=course, title="A")
+            lo_b = LearningOutcome.objects.create(course=course, title="B")
+            LO_PO_Contribution.objects.create(learning_outcome=lo_a, program_outcome=po1, contribution_percentage=60)
+            LO_PO_Contribution.objects.create(learning_outcome=lo_a, program_outcome=po2, contribution_percentage=40)
+            LO_PO_Contribution.objects.create(learning_outcome=lo_b, program_outcome=po2, contribution_percentage=100)
+            midterm = Assessment.objects.create(type="MIDTERM", course=course, weight_percentage=35)
+            final = Assessment.objects.create(type="FINAL", course=course, weight_percentage=65)
+            AssessmentLearningOutcome.objects.create(assessment=midterm, learning_outcome=lo_a, contribution_percentage=100)
+            AssessmentLearningOutcome.objects.create(assessment=final, learning_outcome=lo_a, contribution_percentage=50)
+            AssessmentLearningOutcome.objects.create(assessment=final, learning_outcome=lo_b, contribution_percentage=50)
+            for student, score in zip(self.students, scores):
+                Grade.objects.create(student=student, assessment=midterm, score_percentage=score)
+                if score > 50:
+                    Grade.objects.create(student=student, assessment=final, score_percentage=score - 7)
+
+
+class BatchPOScoreTest(POCurriculumMixin, TestCase):
+    def setUp(self):
+        self.build_curriculum()
+
+    def test_matches_per_student_calculation(self):
+        batch = calculate_po_scores()
+        self.assertEqual(set(batch), {s.pk for s in self.students})
+        for student in self.students:
+            expected = calculate_weighted_po_score(student.pk)
+            self.assertEqual(set(batch[student.pk]), set(expected))
+            for code, score in expected.items():
+                self.assertAlmostEqual(batch[student.pk][code], float(score), delta=0.01)
+
+    def test_per_student_score_is_one_query(self):
+        with self.assertNumQueries(1):
+            calculate_weighted_po_score(self.students[0].pk)
+
+    def test_student_filter(self):
+        batch = calculate_po_scores(student_ids=[self.students[0].pk])
+        self.assertEqual(list(batch), [self.students[0].pk])
+
+
+class CachedPOScoreTest(POCurriculumMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.build_curriculum()
+        self.student = self.students[0]
+
+    def assertFresh(self):
+        with self.assertNumQueries(1):
+            cached = cached_weighted_po_score(self.student.pk)
+        self.assertEqual(cached, calculate_weighted_po_score(self.student.pk))
+        with self.assertNumQueries(0):
+            self.assertEqual(cached_weighted_po_score(self.student.pk), cached)
+        return cached
+
+    def test_repeat_lookups_are_free(self):
+        self.assertFresh()
+
+    def test_grade_change_invalidates_only_that_student(self):
+        before = self.assertFresh()
+        cached_weighted_po_score(self.students[1].pk)
+        grade = Grade.objects.filter(student=self.student).first()
+        grade.score_percentage = 12
+        grade.save()
+        self.assertNotEqual(self.assertFresh(), before)
+        with self.assertNumQueries(0):
+            cached_weighted_po_score(self.students[1].pk)
+
+    def test_grade_delete_invalidates(self):
+        before = self.assertFresh()
+        Grade.objects.filter(student=self.student).first().delete()
+        self.assertNotEqual(self.assertFresh(), before)
+
+    def test_upsert_grades_invalidates(self):
+        before = self.assertFresh()
+        grade = Grade.objects.filter(student=self.student).first()
+        upsert_grades({(self.student.pk, grade.assessment_id): Decimal("1.00")})
+        self.assertNotEqual(self.assertFresh(), before)
+
+    def test_mapping_changes_invalidate(self):
+        before = self.assertFresh()
+        alo = AssessmentLearningOutcome.objects.filter(assessment__type="MIDTERM").first()
+        alo.learning_outcome = LearningOutcome.objects.get(course=alo.assessment.course, title="B")
+        alo.save()
+        changed = self.assertFresh()
+        self.assertNotEqual(changed, before)
+
+        LO_PO_Contribution.objects.filter(program_outcome__code="PO2").delete()
+        self.assertEqual(set(self.assertFresh()), {"PO1"})
+
+    def test_repeat_dashboard_view_skips_po_query(self):
+        self.client.force_login(self.student)
+        url = reverse('grades:dashboard')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.context['po_scores'], calculate_weighted_po_score(self.student.pk))
+        self.assertFalse([q for q in ctx.captured_queries if 'assessmentpoweight' in q['sql']])
+
+    def test_program_outcome_rename_invalidates(self):
+        self.assertFresh()
+        ProgramOutcome.objects.filter(code="PO1").update(code="PO9")
+        ProgramOutcome.objects.get(code="PO9").save()
+        self.assertIn("PO9", self.assertFresh())
+
+
+class TeacherGradeEntryTest(TestCase):
+    def setUp(self):
+        self.instructor = User.objects.create_user(username='teacher', password='x', role='INSTRUCTOR')
+        self.course = Course.objects.create(code="CSE401", title="Compilers", ects_credit=6, instructor=self.instructor)
+        self.assessments = [
+            Assessment.objects.create(type="MIDTERM", course=self.course, weight_percentage=40),
+            Assessment.objects.create(type="FINAL", course=self.course, weight_percentage=60),
+        ]
+        self.url = reverse('grades:teacher_grade_entry', args=[self.course.id])
+        self.client.force_login(self.instructor)
+
+    def enroll(self, count):
+        start = User.objects.filter(role='STUDENT').count()
+        students = [
+            User.objects.create_user(username=f'enrolled{start + i}', password='x', role='STUDENT')
+            for i in range(count)
+        ]
+        for student in students:
+            Enrollment.objects.create(student=student, course=self.course)
+        return students
+
+    def post_all(self, students, score):
+        data = {
+            f"score_{s.id}_{a.id}": str(score) for s in students for a in self.assessments
+        }
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(self.url, data)
+        return len(ctx.captured_queries)
+
+    def test_get_creates_missing_cells(self):
+        students = self.enroll(3)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Grade.objects.filter(assessment__course=self.course).count(), 6)
+        self.assertEqual(
+            CourseGradeSnapshot.objects.get(student=students[0], course=self.course).weighted_score, 0
+        )
+
+    def test_save_rejects_extra_decimals(self):
+        students = self.enroll(1)
+        self.client.get(self.url)
+        cell = f"score_{students[0].id}_{self.assessments[0].id}"
+        self.client.post(self.url, {cell: "85.555"})
+        self.assertEqual(
+            Grade.objects.get(student=students[0], assessment=self.assessments[0]).score_percentage, Decimal("0")
+        )
+
+    def test_save_writes_changed_cells_only(self):
+        students = self.enroll(2)
+        self.client.get(self.url)
+        self.post_all(students, 75)
+        self.assertEqual(set(Grade.objects.values_list('score_percentage', flat=True)), {Decimal("75")})
+        self.assertEqual(
+            CourseGradeSnapshot.objects.get(student=students[1], course=self.course).weighted_score, Decimal("75")
+        )
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.post_all(students, 75)
+        self.assertFalse([q for q in ctx.captured_queries if q['sql'].startswith('UPDATE "grades_grade"')])
+
+    def test_save_query_count_is_flat(self):
+        few = self.enroll(2)
+        self.client.get(self.url)
+        small = self.post_all(few, 60)
+        many = few + self.enroll(10)
+        self.client.get(self.url)
+        large = self.post_all(many, 80)
+        self.assertEqual(small, large)
+
+    def test_grid_is_streamed_with_prefilled_scores(self):
+        students = self.enroll(3)
+        Grade.objects.create(student=students[1], assessment=self.assessments[1], score_percentage=Decimal("88.50"))
+        response = self.client.get(self.url)
+        self.assertTrue(response.streaming)
+        page = b"".join(response.streaming_content).decode()
+        self.assertIn(f'name="score_{students[1].id}_{self.assessments[1].id}" value="88.50"', page)
+        self.assertIn(f'name="score_{students[2].id}_{self.assessments[0].id}" value="0.00"', page)
+        self.assertIn("</table>", page.split("enrolled2")[1])
+        self.assertIn("csrftoken", response.cookies)
+
+    def test_grid_rows_count_towards_template_time(self):
+        self.enroll(40)
+        self.client.get(self.url)
+        middleware = ['Acumie.instrumentation.RequestMetricsMiddleware'] + settings.MIDDLEWARE
+        with override_settings(MIDDLEWARE=middleware):
+            client = self.client_class()
+            client.force_login(self.instructor)
+            response = client.get(self.url)
+            head_tpl = float(response['Server-Timing'].split('tpl;dur=')[1].split(',')[0])
+            with self.assertLogs('acumie.requests', level='INFO') as logs:
+                b"".join(response.streaming_content)
+        self.assertTrue(logs.records[0].streamed)
+        self.assertGreater(logs.records[0].tpl_ms, head_tpl)
+
+    def test_grid_query_count_is_flat(self):
+        self.enroll(2)
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as small:
+            b"".join(self.client.get(self.url).streaming_content)
+        self.enroll(10)
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as large:
+            b"".join(self.client.get(self.url).streaming_content)
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+
+class GradeStatisticsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.instructor = User.objects.create_user(username='teacher', password='x', role='INSTRUCTOR')
+        self.course = Course.objects.create(code="CSE405", title="Statistics", ects_credit=5, instructor=self.instructor)
+        self.midterm = Assessment.objects.create(type="MIDTERM", course=self.course, weight_percentage=40)
+        self.final = Assessment.objects.create(type="FINAL", course=self.course, weight_percentage=60)
+        self.scores = [45, 58.5, 62, 70, 70, 81.25, 93, 100]
+        self.students = [User.objects.create(username=f'st{i}', role='STUDENT') for i in range(len(self.scores) + 1)]
+        for student, score in zip(self.students, self.scores):
+            Grade.objects.create(student=student, assessment=self.midterm, score_percentage=score)
+            Grade.objects.create(student=student, assessment=self.final, score_percentage=min(100, score + 10))
+        # An untouched cell of the entry grid does not count as a grade.
+        Grade.objects.create(student=self.students[-1], assessment=self.midterm, score_percentage=0)
+
+    def stats(self):
+        return {row["type"]: row for row in course_grade_statistics(self.course.id)["assessments"]}
+
+    def test_describe_matches_reference_statistics(self):
+        midterm = self.stats()["MIDTERM"]
+        self.assertEqual(midterm["count"], len(self.scores))
+        self.assertAlmostEqual(midterm["mean"], statistics.fmean(self.scores), places=2)
+        self.assertAlmostEqual(midterm["median"], statistics.median(self.scores), places=2)
+        self.assertAlmostEqual(midterm["std"], statistics.pstdev(self.scores), places=2)
+        self.assertEqual((midterm["min"], midterm["max"]), (45.0, 100.0))
+        self.assertAlmostEqual(midterm["percentiles"]["p25"], statistics.quantiles(self.scores, n=4, method="inclusive")[0], delta=0.01)
+        self.assertEqual(midterm["histogram"]["counts"], [0, 0, 0, 0, 1, 1, 1, 2, 1, 2])
+        self.assertEqual(len(midterm["histogram"]["edges"]), 11)
+
+        course = course_grade_statistics(self.course.id)["course"]
+        totals = [0.4 * s + 0.6 * min(100, s + 10) for s in self.scores]
+        self.assertEqual(course["count"], len(self.scores))
+        self.assertAlmostEqual(course["mean"], statistics.fmean(totals), places=2)
+
+    def test_results_are_cached_until_grades_change(self):
+        self.stats()
+        with self.assertNumQueries(0):
+            self.stats()
+
+        Grade.objects.filter(student=self.students[0], assessment=self.midterm).get().delete()
+        self.assertEqual(self.stats()["MIDTERM"]["count"], len(self.scores) - 1)
+
+        with transaction.atomic():
+            upsert_grades({(self.students[-1].pk, self.midterm.pk): 50})
+        self.assertEqual(self.stats()["MIDTERM"]["count"], len(self.scores))
+
+        self.final.weight_percentage = 50
+        self.final.save()
+        self.assertEqual(self.stats()["FINAL"]["weight"], "50.00")
+
+    def test_json_endpoint_and_grade_entry_page(self):
+        url = reverse('grades:teacher_grade_stats', args=[self.course.id])
+        other = User.objects.create_user(username='other', password='x', role='INSTRUCTOR')
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.force_login(self.instructor)
+        for student in self.students:
+            Enrollment.objects.create(student=student, course=self.course)
+        payload = self.client.get(url).json()
+        self.assertEqual(payload["course_id"], self.course.id)
+        self.assertEqual([row["type"] for row in payload["assessments"]], ["FINAL", "MIDTERM"])
+
+        response = self.client.get(reverse('grades:teacher_grade_entry', args=[self.course.id]))
+        page = b"".join(response.streaming_content).decode()
+        self.assertIn("Distribution (0–100)", page)
+        self.assertIn(url, page)
+
+
+class BatchGPAConversionTest(TestCase):
+    def test_points_match_scalar_conversion(self):
+        scores = [Decimal(i).scaleb(-2) for i in range(-100, 10101)]  # every stored score, incl. half-even ties
+        scores += [Decimal("20.100001"), Decimal("20.1000000000000000001"), 85, 62.5, 1e9, -3.0, "74.35", "n/a", None]
+        expected = [get_4_scale_point(s) for s in scores]
+        points = four_scale_points(scores)
+        self.assertEqual(points, expected)
+        self.assertEqual([str(p) for p in points], [str(p) for p in expected])
+
+    def test_weighted_gpa_matches_decimal_sum(self):
+        scores = [Decimal("91.254300"), Decimal("47.500000"), Decimal("20.100000")]
+        ects = [Decimal("5.00"), Decimal("7.50"), Decimal("3.00")]
+        points, gpa = transcript(scores, ects)
+        total = sum((get_4_scale_point(s) * e for s, e in zip(scores, ects)), Decimal("0.00"))
+        self.assertEqual(points, [get_4_scale_point(s) for s in scores])
+        self.assertEqual(gpa, total / sum(ects, Decimal("0.00")))
+        self.assertIsNone(transcript([Decimal("80")], [Decimal("0.00")])[1])
+
+    def test_weighted_gpas_group_by_student(self):
+        cents = four_scale_cents([100, 60, 80, 75])
+        gpas = weighted_gpas([2, 1, 2, 3], cents, [4, 6, 2, 0])
+        self.assertEqual(gpas, {1: Decimal("2.00"), 2: (Decimal("4.00") * 4 + Decimal("3.00") * 2) / 6})
+
+
+class TranscriptBatchTest(TestCase):
+    def setUp(self):
+        self.students = [User.objects.create_user(username=f'tr{i}', password='x', role='STUDENT') for i in range(4)]
+        plans = (("CSE601", "5.00", (91.5, 47, 66.35)), ("CSE602", "7.50", (58, 83.25)), ("CSE603", "3.00", ()))
+        for code, ects, scores in plans:
+            course = Course.objects.create(code=code, title=code, ects_credit=Decimal(ects))
+            midterm = Assessment.objects.create(type="MIDTERM", course=course, weight_percentage=Decimal("33.33"))
+            final = Assessment.objects.create(type="FINAL", course=course, weight_percentage=Decimal("66.67"))
+            for student in self.students[:3]:
+                Enrollment.objects.create(student=student, course=course)
+            for student, score in zip(self.students, scores):
+                Grade.objects.create(student=student, assessment=midterm, score_percentage=score)
+                Grade.objects.create(student=student, assessment=final, score_percentage=min(100, score + 4.5))
+
+    def test_matches_student_dashboard(self):
+        transcripts = {t.student_id: t for t in iter_transcripts()}
+        self.assertEqual(set(transcripts), {s.pk for s in self.students[:3]})  # tr3 is not enrolled anywhere
+        for student in self.students[:3]:
+            self.client.force_login(student)
+            context = self.client.get(reverse('grades:dashboard')).context
+            transcript = transcripts[student.pk]
+            self.assertEqual(transcript.gpa, context['overall_gpa'])
+            self.assertEqual(
+                [(c.code, c.score, c.point) for c in transcript.courses],
+                [(r['code'], r['score'], r['point']) for r in context['course_results']],
+            )
+
+    def test_single_streamed_query(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(len(list(iter_transcripts(chunk_size=1))), 3)
+
+    def test_command_writes_csv_and_refreshes_snapshots(self):
+        CourseGradeSnapshot.objects.update(weighted_score=0, point=0)
+        out, err = StringIO(), StringIO()
+        call_command('compute_transcripts', '--update-snapshots', '--chunk-size', '2', stdout=out, stderr=err)
+        rows = list(csv.DictReader(StringIO(out.getvalue())))
+        self.assertEqual([r['username'] for r in rows], ['tr0', 'tr1', 'tr2'])
+        self.assertEqual(rows[0]['courses'], '3')
+        self.assertEqual(rows[0]['ects'], '15.50')
+        self.assertIn('3 transcript(s)', err.getvalue())
+        snapshot = CourseGradeSnapshot.objects.get(student=self.students[0], course__code="CSE601")
+        self.assertEqual(snapshot.point, get_4_scale_point(snapshot.weighted_score))
+        self.assertGreater(snapshot.weighted_score, 90)
+
+        out = StringIO()
+        call_command('compute_transcripts', '--per-course', stdout=out, stderr=StringIO())
+        self.assertEqual(len(list(csv.DictReader(StringIO(out.getvalue())))), 9)
+
+    def test_background_job(self):
+        spool = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, spool)
+        with self.settings(JOBS_SPOOL_DIR=spool):
+            job = enqueue("grades.transcripts")
+            run_pending_jobs()
+        job.refresh_from_db()
+        self.assertEqual(job.status, JobStatus.SUCCEEDED, job.error)
+        self.assertEqual(job.result['students'], 3)
+        self.assertEqual(job.progress, 3)
+        with open(job.result['path'], newline='') as f:
+            self.assertEqual(len(list(csv.DictReader(f))), 3)
+
+
+class TeacherDashboardTest(TestCase):
+    def setUp(self):
+        self.instructor = User.objects.create_user(username='teacher', password='x', role='INSTRUCTOR')
+        self.client.force_login(self.instructor)
+        self.url = reverse('grades:teacher_dashboard')
+
+    def add_course(self, code, students, scores):
+        course = Course.objects.create(code=code, title=code, ects_credit=5, instructor=self.instructor)
+        assessments = [
+            Assessment.objects.create(type="MIDTERM", course=course, weight_percentage=50),
+            Assessment.objects.create(type="FINAL", course=course, weight_percentage=50),
+        ]
+        for student in students:
+            Enrollment.objects.create(student=student, course=course)
+        for (student, assessment), score in zip(((s, a) for s in students for a in assessments), scores):
+            Grade.objects.create(student=student, assessment=assessment, score_percentage=score)
+        return course, assessments
+
+    def test_course_statistics(self):
+        students = [User.objects.create_user(username=f'ds{i}', password='x', role='STUDENT') for i in range(3)]
+        self.add_course("CSE501", students, [80, 60, 0, 90])  # 3 of 6 cells graded
+        self.add_course("CSE502", [], [])
+        response = self.client.get(self.url)
+        stats = {c.code: c for c in response.context['my_courses']}
+        self.assertEqual(stats["CSE501"].enrolled_count, 3)
+        self.assertEqual(stats["CSE501"].graded_count, 3)
+        self.assertEqual(stats["CSE501"].grading_completeness, 50)
+        self.assertAlmostEqual(float(stats["CSE501"].average_score), 76.67, places=2)
+        self.assertIsNone(stats["CSE502"].grading_completeness)
+        self.assertIsNone(stats["CSE502"].average_score)
+        self.assertContains(response, "50% graded")
+
+    def test_query_count_is_flat_and_requests_are_paginated(self):
+        def measure():
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(self.url)
+            return len(ctx.captured_queries), response
+
+        students = [User.objects.create_user(username=f'ds{i}', password='x', role='STUDENT') for i in range(3)]
+        _, assessments = self.add_course("CSE503", students, [70] * 6)
+        FeedbackRequest.objects.create(student=students[0], assessment=assessments[0])
+        small, _ = measure()
+
+        for i in range(4):
+            more = [User.objects.create_user(username=f'dm{i}_{j}', password='x', role='STUDENT') for j in range(6)]
+            _, assessments = self.add_course(f"CSE6{i:02d}", more, [55] * 12)
+            for student in more:
+                FeedbackRequest.objects.create(student=student, assessment=assessments[1])
+        large, response = measure()
+
+        self.assertEqual(small, large)
+        page = response.context['feedback_requests']
+        self.assertEqual(page.paginator.count, 25)
+        self.assertEqual(len(page.object_list), 20)
+        self.assertEqual(len(self.client.get(self.url, {'page': 2}).context['feedback_requests'].object_list), 5)
+
+
+class GradeCSVImportTest(TestCase):
+    def setUp(self):
+        self.instructor = User.objects.create_user(username='teacher', password='x', role='INSTRUCTOR')
+        self.course = Course.objects.create(code="CSE402", title="Networks", ects_credit=5, instructor=self.instructor)
+        self.other_course = Course.objects.create(code="CSE403", title="Security", ects_credit=5)
+        self.quiz = Assessment.objects.create(type="QUIZ", course=self.course, weight_percentage=100)
+        self.foreign = Assessment.objects.create(type="QUIZ", course=self.other_course, weight_percentage=100)
+        self.ada = User.objects.create_user(username='ada', password='x', role='STUDENT')
+        self.alan = User.objects.create_user(username='alan', password='x', role='STUDENT')
+        Grade.objects.create(student=self.alan, assessment=self.quiz, score_percentage=10)
+
+    def csv_file(self, rows):
+        body = "username,assessment_id,score\n" + "".join(f"{r}\n" for r in rows)
+        return SimpleUploadedFile("grades.csv", body.encode("utf-8"), content_type="text/csv")
+
+    def test_import_reports_each_bad_line(self):
+        upload = self.csv_file([
+            f"ada,{self.quiz.id},88.5",
+            f"alan,{self.quiz.id},64",
+            f"ghost,{self.quiz.id},50",
+            f"ada,{self.foreign.id},50",
+            f"ada,{self.quiz.id},150",
+            "ada,abc,10",
+        ])
+        report = import_grade_csv(upload, self.course, batch_size=2)
+        self.assertEqual((report.rows, report.created, report.updated), (6, 1, 1))
+        self.assertEqual([line for line, _ in report.errors], [4, 5, 6, 7])
+        self.assertEqual(Grade.objects.get(student=self.ada).score_percentage, Decimal("88.5"))
+        self.assertEqual(Grade.objects.get(student=self.alan).score_percentage, Decimal("64"))
+        self.assertEqual(CourseGradeSnapshot.objects.get(student=self.ada, course=self.course).weighted_score, Decimal("88.5"))
+
+    def test_undecodable_line_is_a_file_error(self):
+        upload = SimpleUploadedFile("grades.csv", b"username,assessment_id,score\n\xff\xfe,1,50\n")
+        report = import_grade_csv(upload, self.course).as_dict()
+        self.assertEqual((report["rows"], report["unchanged"], report["error_count"]), (0, 0, 1))
+        self.assertIn("could not read file", report["errors"][0]["message"])
+
+        upload = self.csv_file([f"ada,{self.quiz.id},70", "ghost,1,50"])
+        upload = SimpleUploadedFile("grades.csv", upload.read() + b"\xff,1,50\n")
+        report = import_grade_csv(upload, self.course).as_dict()
+        self.assertEqual((report["rows"], report["created"], report["unchanged"], report["error_count"]), (2, 1, 0, 2))
+
+    def test_reimport_with_extra_decimals_is_stable(self):
+        report = import_grade_csv(self.csv_file([f"ada,{self.quiz.id},85.555"]), self.course)
+        self.assertEqual(report.errors, [(2, "score must have at most two decimal places (85.555).")])
+        self.assertFalse(Grade.objects.filter(student=self.ada).exists())
+
+        for _ in range(2):
+            created, updated = upsert_grades({(self.ada.id, self.quiz.id): Decimal("85.555")})
+        self.assertEqual((created, updated), ([], []))
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT SUM(score_percentage) FROM grades_grade WHERE student_id = %s", [self.ada.id])
+            self.assertEqual(Decimal(str(cursor.fetchone()[0])), Decimal("85.56"))
+        self.assertEqual(GradeAudit.objects.filter(student=self.ada).count(), 1)
+
+    def test_upload_view(self):
+        self.client.force_login(self.instructor)
+        url = reverse('grades:teacher_grade_bulk_upload', args=[self.course.id])
+        response = self.client.post(url, {"csv_file": self.csv_file([f"ada,{self.quiz.id},70"])})
+        self.assertRedirects(response, reverse('grades:teacher_grade_entry', args=[self.course.id]), fetch_redirect_response=False)
+        self.assertEqual(Grade.objects.get(student=self.ada).score_percentage, Decimal("70"))
+
+
+class GradeAuditTrailTest(TestCase):
+    def setUp(self):
+        self.instructor = User.objects.create_user(username='auditor', password='x', role='INSTRUCTOR')
+        self.course = Course.objects.create(code="CSE404", title="Ethics", ects_credit=3, instructor=self.instructor)
+        self.quiz = Assessment.objects.create(type="QUIZ", course=self.course, weight_percentage=100)
+        self.students = [User.objects.create(username=f"audited{i}", role='STUDENT') for i in range(3)]
+
+    def trail(self):
+        return list(
+            GradeAudit.objects.order_by('id').values_list('student__username', 'action', 'old_score', 'new_score', 'source')
+        )
+
+    def test_bulk_upsert_audits_in_one_insert_without_rereading(self):
+        Grade.objects.create(student=self.students[0], assessment=self.quiz, score_percentage=40)
+        GradeAudit.objects.all().delete()
+        existing = load_grades({(s.pk, self.quiz.pk) for s in self.students})
+        scores = {(s.pk, self.quiz.pk): Decimal("75.50") for s in self.students}
+        with CaptureQueriesContext(connection) as ctx:
+            with transaction.atomic(), audit_context(self.instructor, SOURCE_GRADE_ENTRY):
+                upsert_grades(scores, existing=existing)
+        audit_sql = [q['sql'] for q in ctx.captured_queries if 'grades_gradeaudit' in q['sql']]
+        self.assertEqual(len(audit_sql), 1)
+        self.assertTrue(audit_sql[0].startswith('INSERT'))
+        self.assertEqual(sorted(self.trail()), [
+            ('audited0', 'UPDATE', Decimal("40.00"), Decimal("75.50"), SOURCE_GRADE_ENTRY),
+            ('audited1', 'CREATE', None, Decimal("75.50"), SOURCE_GRADE_ENTRY),
+            ('audited2', 'CREATE', None, Decimal("75.50"), SOURCE_GRADE_ENTRY),
+        ])
+        self.assertEqual(set(GradeAudit.objects.values_list('changed_by', flat=True)), {self.instructor.pk})
+
+    def test_single_save_and_delete_use_loaded_values(self):
+        Grade.objects.create(student=self.students[0], assessment=self.quiz, score_percentage=40)
+        grade = Grade.objects.get(student=self.students[0])
+        grade.score_percentage = 55
+        grade._changed_by = self.instructor
+        with CaptureQueriesContext(connection) as ctx:
+            grade.save()
+        rereads = [q for q in ctx.captured_queries if q['sql'].startswith('SELECT') and f'"grades_grade"."id" = {grade.pk}' in q['sql']]
+        self.assertEqual(rereads, [])
+        grade.save()  # unchanged, not audited
+        grade.delete()
+        self.assertEqual(self.trail(), [
+            ('audited0', 'CREATE', None, Decimal("40.00"), ''),
+            ('audited0', 'UPDATE', Decimal("40.00"), Decimal("55.00"), ''),
+            ('audited0', 'DELETE', Decimal("55.00"), None, ''),
+        ])
+        self.assertEqual(GradeAudit.objects.filter(action='UPDATE').get().changed_by, self.instructor)
+
+    def test_refresh_from_db_resets_loaded_score(self):
+        Grade.objects.create(student=self.students[0], assessment=self.quiz, score_percentage=40)
+        grade = Grade.objects.get(student=self.students[0])
+        other = Grade.objects.get(pk=grade.pk)
+        other.score_percentage = 50
+        other.save()
+
+        grade.refresh_from_db()
+        grade.score_percentage = 40
+        grade.save()
+        self.assertEqual(self.trail(), [
+            ('audited0', 'CREATE', None, Decimal("40.00"), ''),
+            ('audited0', 'UPDATE', Decimal("40.00"), Decimal("50.00"), ''),
+            ('audited0', 'UPDATE', Decimal("50.00"), Decimal("40.00"), ''),
+        ])
+
+    def test_rolled_back_changes_leave_no_audit(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic(), audit_context(self.instructor, SOURCE_GRADE_ENTRY):
+                upsert_grades({(self.students[0].pk, self.quiz.pk): 90})
+                raise RuntimeError
+        self.assertFalse(GradeAudit.objects.exists())
+
+    def test_csv_import_is_attributed(self):
+        body = f"username,assessment_id,score\naudited1,{self.quiz.id},61\n".encode()
+        import_grade_csv(SimpleUploadedFile("grades.csv", body), self.course, changed_by=self.instructor)
+        self.assertEqual(self.trail(), [('audited1', 'CREATE', None, Decimal("61.00"), SOURCE_CSV)])
+
+    def test_admin_edit_is_attributed(self):
+        admin_user = User.objects.create_superuser(username='root', email='root@example.com', password='x')
+        grade = Grade.objects.create(student=self.students[2], assessment=self.quiz, score_percentage=30)
+        self.client.force_login(admin_user)
+        response = self.client.post(reverse('admin:grades_grade_change', args=[grade.pk]), {
+            'student': self.students[2].pk, 'assessment': self.quiz.pk, 'score_percentage': '35',
+        })
+        self.assertEqual(response.status_code, 302)
+        entry = GradeAudit.objects.get(action='UPDATE')
+        self.assertEqual((entry.old_score, entry.new_score, entry.changed_by, entry.source),
+                         (Decimal("30.00"), Decimal("35.00"), admin_user, SOURCE_ADMIN))
+
+    def test_assessment_delete_removes_its_trail(self):
+        Grade.objects.create(student=self.students[0], assessment=self.quiz, score_percentage=40)
+        self.quiz.delete()
+        self.assertFalse(GradeAudit.objects.exists())
+
+
+class GradeBookExportTest(POCurriculumMixin, TestCase):
+    def setUp(self):
+        self.build_curriculum()
+        # Age the fixtures past the export safety lag.
+        Grade.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def export(self, *args):
+        out = StringIO()
+        call_command("export_grade_book", *args, stdout=out, stderr=StringIO())
+        return out.getvalue()
+
+    def test_csv_rows_carry_outcome_codes(self):
+        rows = list(csv.DictReader(StringIO(self.export())))
+        self.assertEqual(len(rows), Grade.objects.count())
+        final = next(r for r in rows if r["assessment_type"] == "FINAL" and r["student_username"] == "s0")
+        self.assertEqual(final["course_code"], "CSE301")
+        self.assertEqual(final["score_percentage"], "84.00")
+        self.assertEqual(final["learning_outcomes"], "LO-1;LO-2")
+        self.assertEqual(final["program_outcomes"], "PO1;PO2")
+
+    def test_rows_are_streamed_from_one_grade_query(self):
+        with self.assertNumQueries(3):  # LO codes, PO codes, grades
+            rows = list(grade_book_rows())
+        self.assertEqual(len(rows), Grade.objects.count())
+        self.assertTrue(all(len(row) == len(EXPORT_COLUMNS) for row in rows))
+
+    def test_incremental_export_follows_the_watermark(self):
+        watermark = self.tmp / "grades.watermark"
+        output = self.tmp / "grades.jsonl"
+        self.export("--format", "jsonl", "--output", str(output), "--watermark-file", str(watermark))
+        self.assertEqual(len(output.read_text().splitlines()), Grade.objects.count())
+
+        self.export("--format", "jsonl", "--output", str(output), "--watermark-file", str(watermark))
+        self.assertEqual(output.read_text(), "")
+
+        grade = Grade.objects.get(student=self.students[1], assessment__type="MIDTERM", assessment__course__code="CSE302")
+        with transaction.atomic():
+            upsert_grades({(grade.student_id, grade.assessment_id): 71})
+        # Still within the safety lag: left for a later run, not skipped.
+        self.export("--format", "jsonl", "--output", str(output), "--watermark-file", str(watermark))
+        self.assertEqual(output.read_text(), "")
+
+        later = timezone.now() + timedelta(minutes=10)
+        with mock.patch("grades.export.timezone.now", return_value=later):
+            self.export("--format", "jsonl", "--output", str(output), "--watermark-file", str(watermark))
+        records = [json.loads(line) for line in output.read_text().splitlines()]
+        self.assertEqual([(r["grade_id"], r["score_percentage"]) for r in records], [(grade.pk, "71.00")])
+
+    def test_course_filter_and_bad_input(self):
+        rows = list(csv.DictReader(StringIO(self.export("--course", "CSE302"))))
+        self.assertEqual({r["course_code"] for r in rows}, {"CSE302"})
+        with self.assertRaises(CommandError):
+            self.export("--course", "NOPE")
+        with self.assertRaises(CommandError):
+            self.export("--since", "yesterday")
+        with self.assertRaises(CommandError):
+            self.export("--format", "parquet")
+
+    def test_staff_endpoint_streams(self):
+        staff = User.objects.create_user(username="analyst", password="x", is_staff=True)
+        self.client.force_login(self.students[0])
+        self.assertEqual(self.client.get(reverse("grades:export")).status_code, 302)
+
+        self.client.force_login(staff)
+        response = self.client.get(reverse("grades:export"), {"format": "jsonl", "course": "CSE301"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        records = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(len(records), Grade.objects.filter(assessment__course__code="CSE301").count())
+
+        later = self.client.get(reverse("grades:export"), {"since": response["X-Export-Watermark"]})
+        self.assertEqual(b"".join(later.streaming_content).decode().splitlines(), [",".join(EXPORT_COLUMNS)])
+        self.assertEqual(self.client.get(reverse("grades:export"), {"format": "parquet"}).status_code, 400)
@@ -8,6 +8,8 @@ urlpatterns = [
     path('dashboard/', views.grade_dashboard_view, name='dashboard'),
     path('teacher/dashboard/', views_teacher.teacher_dashboard, name='teacher_dashboard'),
     path('teacher/course/<int:course_id>/grades/', views_teacher.teacher_grade_entry, name='teacher_grade_entry'),
+    path('teacher/course/<int:course_id>/grades/stats/', views_teacher.teacher_grade_statistics, name='teacher_grade_stats'),
     path('teacher/course/<int:course_id>/grades/bulk-upload/', views_teacher.teacher_grade_bulk_upload, name='teacher_grade_bulk_upload'),
-    path('average/all/', views.all_grades_average_view, name='all_grades_average')
+    path('average/all/', views.all_grades_average_view, name='all_grades_average'),
+    path('export/', views.grade_book_export_view, name='export'),
 ]
\ No newline at end of file
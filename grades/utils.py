@@ -1,7 +1,11 @@
 from decimal import Decimal
-from collections import defaultdict
+from django.conf import settings
+from django.db.models import DecimalField, F, Sum
+from Acumie.cache import get_or_compute, namespace_version
+from outcomes.weights import PO_MAPPING_NAMESPACE
 from .models import Grade
-from outcomes.models import LO_PO_Contribution
+
+WEIGHTED_SUM_QUANTUM = Decimal("0.0001")
 
 def get_4_scale_point(score):
     # Linear mapping anchored at tens: 100->4.00, 90->3.50, 80->3.00, ...
@@ -22,42 +26,110 @@ def get_4_scale_point(score):
         gpa = Decimal("4.00")
     return gpa.quantize(Decimal("0.00"))
 
+def weighted_score_sum():
+    """SUM(score * weight) of a grade queryset; course_score() turns it into the 0-100 course grade."""
+    return Sum(
+        F('score_percentage') * F('assessment__weight_percentage'),
+        output_field=DecimalField(max_digits=12, decimal_places=4),
+    )
+
+def course_score(total):
+    # score and weight both carry two decimals, so the raw sum is exact at four
+    # places; quantizing strips the float noise SQLite adds to NUMERIC arithmetic.
+    return Decimal(str(total)).quantize(WEIGHTED_SUM_QUANTUM) / Decimal("100")
+
+def _weighted_course_totals(grades, *group_by):
+    # SUM(score * weight) per group in one aggregated query.
+    rows = (
+        grades.order_by()
+        .values(*group_by)
+        .annotate(total=weighted_score_sum())
+        .values_list(*group_by, 'total')
+    )
+    totals = {}
+    for *key, total in rows:
+        if total is None:
+            continue
+        totals[key[0] if len(key) == 1 else tuple(key)] = course_score(total)
+    return totals
+
+def calculate_course_grades_for_student(student, courses=None):
+    """
+    Weighted course grades of one student, keyed by course id.
+
+    Every course in `courses` (default: all courses the student has grades in)
+    gets an entry; missing grades count as zero.
+    """
+    grades = Grade.objects.filter(student=student)
+    course_ids = None
+    if courses is not None:
+        course_ids = [getattr(c, "pk", c) for c in courses]
+        grades = grades.filter(assessment__course_id__in=course_ids)
+    totals = _weighted_course_totals(grades, 'assessment__course_id')
+    if course_ids is None:
+        return totals
+    return {cid: totals.get(cid, Decimal("0.00")) for cid in course_ids}
+
+def calculate_course_grades_for_course(course, students=None):
+    """Weighted course grades of every graded student in `course`, keyed by student id."""
+    grades = Grade.objects.filter(assessment__course=course)
+    student_ids = None
+    if students is not None:
+        student_ids = [getattr(s, "pk", s) for s in students]
+        grades = grades.filter(student_id__in=student_ids)
+    totals = _weighted_course_totals(grades, 'student_id')
+    if student_ids is None:
+        return totals
+    return {sid: totals.get(sid, Decimal("0.00")) for sid in student_ids}
+
+def calculate_all_course_grades(grades=None):
+    """Weighted course grades keyed by (student_id, course_id) for every graded pair."""
+    if grades is None:
+        grades = Grade.objects.all()
+    return _weighted_course_totals(grades, 'student_id', 'assessment__course_id')
+
 def calculate_course_grade(student, course):
-    assessments = course.assessments.all()
-    total_grade = Decimal("0.00")
-    for assessment in assessments:
-        weight = Decimal(str(assessment.weight_percentage)) / Decimal("100.00")
-        grade_obj = Grade.objects.filter(student=student, assessment=assessment).first()
-        score = Decimal(str(grade_obj.score_percentage)) if grade_obj else Decimal("0.00")
-        total_grade += (score * weight)
-    return total_grade
+    return calculate_course_grades_for_student(student, [course])[course.pk]
 
 def calculate_weighted_po_score(student_id: int):
-    student_grades = Grade.objects.filter(student_id=student_id).select_related('assessment__course')
-    if not student_grades.exists():
-        return {}
-    po_totals = defaultdict(Decimal)
-    total_ects_impact = defaultdict(Decimal)
-    all_contributions = LO_PO_Contribution.objects.select_related('program_outcome', 'learning_outcome').all()
-    lo_po_map = defaultdict(list)
-    for contrib in all_contributions:
-        lo_po_map[contrib.learning_outcome_id].append(contrib)
-    for grade in student_grades:
-        assessment = grade.assessment
-        course = assessment.course
-        raw_score_ratio = grade.score_percentage / Decimal(100)
-        assessment_weight = assessment.weight_percentage / Decimal(100)
-        linked_los = assessment.learning_outcomes.all()
-        for lo in linked_los:
-            po_contributions = lo_po_map.get(lo.id, [])
-            for contrib in po_contributions:
-                po_code = contrib.program_outcome.code
-                val = (raw_score_ratio * assessment_weight * (contrib.contribution_percentage / Decimal(100)) * course.ects_credit)
-                po_totals[po_code] += val
-                max_val = (Decimal(1.0) * assessment_weight * (contrib.contribution_percentage / Decimal(100)) * course.ects_credit)
-                total_ects_impact[po_code] += max_val
+    """
+    PO attainment of one student as a single join of Grade against the
+    outcomes.AssessmentPOWeight index: per PO, SUM(score * w) / SUM(w) where
+    w is the assessment's effective weight for that PO.
+    """
+    rows = (
+        Grade.objects.filter(student_id=student_id, assessment__po_weights__isnull=False)
+        .order_by()
+        .values(po_code=F('assessment__po_weights__program_outcome__code'))
+        .annotate(
+            earned=Sum(F('score_percentage') * F('assessment__po_weights__effective_weight'), output_field=DecimalField()),
+            possible=Sum('assessment__po_weights__effective_weight'),
+        )
+        .order_by('po_code')
+    )
     final_po_scores = {}
-    for po_code, earned_score in po_totals.items():
-        max_score = total_ects_impact.get(po_code, Decimal(1))
-        final_po_scores[po_code] = round((earned_score / max_score) * 100, 2) if max_score > 0 else 0.0
-    return final_po_scores
\ No newline at end of file
+    for row in rows:
+        earned = Decimal(str(row['earned'] or 0))
+        possible = Decimal(str(row['possible'] or 0))
+        final_po_scores[row['po_code']] = round(earned / possible, 2) if possible > 0 else 0.0
+    return final_po_scores
+
+
+def po_scores_namespace(student_id):
+    """Cache namespace versioned by the student's grades (see grades.receivers and grades.bulk)."""
+    return f"po-scores:student:{student_id}"
+
+
+def cached_weighted_po_score(student_id: int):
+    """
+    calculate_weighted_po_score memoized per student. The key carries the
+    student's grade version and the global PO mapping version, so a grade
+    change or a curriculum mapping change is never served stale.
+    """
+    return get_or_compute(
+        po_scores_namespace(student_id),
+        [namespace_version(PO_MAPPING_NAMESPACE)],
+        lambda: calculate_weighted_po_score(student_id),
+        timeout=getattr(settings, "PO_SCORE_CACHE_TIMEOUT", 24 * 60 * 60),
+        label="po-scores",
+    )
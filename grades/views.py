@@ -1,10 +1,14 @@
 from django.shortcuts import render, redirect
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
 from django.db.models import Avg
 from decimal import Decimal
 from courses.models import Course
+from .export import CONTENT_TYPES, STREAMING_FORMATS, export_watermark, grade_book_rows, iter_export, parse_watermark
 from .models import Grade
-from .utils import calculate_weighted_po_score, calculate_course_grade, get_4_scale_point
+from .snapshots import get_course_grade_snapshots
+from .utils import cached_weighted_po_score
 
 @login_required
 def grade_dashboard_view(request):
@@ -24,16 +28,18 @@ def grade_dashboard_view(request):
         course_results = []
         total_gpa_weighted = Decimal("0.00")
         total_ects = Decimal("0.00")
-        for course in courses_qs:
-            score_100 = calculate_course_grade(user, course)
-            point_4 = get_4_scale_point(score_100)
+        courses = list(courses_qs)
+        snapshots = get_course_grade_snapshots(user, courses)
+        for course in courses:
+            score_100 = snapshots[course.pk].weighted_score
+            point_4 = snapshots[course.pk].point
             course_results.append({'code': course.code, 'title': course.title, 'ects': course.ects_credit, 'score': score_100, 'point': point_4})
             total_gpa_weighted += (point_4 * Decimal(str(course.ects_credit)))
             total_ects += Decimal(str(course.ects_credit))
         context["course_results"] = course_results
         context["overall_gpa"] = (total_gpa_weighted / total_ects) if total_ects > 0 else 0
         try:
-            po_scores = calculate_weighted_po_score(user.id)
+            po_scores = cached_weighted_po_score(user.id)
         except:
             po_scores = {}
         context["po_scores"] = po_scores
@@ -43,4 +49,34 @@ def grade_dashboard_view(request):
 @login_required
 def all_grades_average_view(request):
     avg = Grade.objects.aggregate(a=Avg('score_percentage'))['a']
-    return render(request, "grades/all_grades_average.html", {"average": f"{avg:.2f}" if avg else "0.00"})
\ No newline at end of file
+    return render(request, "grades/all_grades_average.html", {"average": f"{avg:.2f}" if avg else "0.00"})
+
+@staff_member_required
+def grade_book_export_view(request):
+    """
+    Stream the grade book as CSV or JSON lines; ?since=<ISO timestamp> for an
+    incremental export of score changes (see grade_book_rows for which
+    columns are only current in a full export).
+    """
+    fmt = request.GET.get("format", "csv")
+    if fmt not in STREAMING_FORMATS:
+        return HttpResponseBadRequest(f"format must be one of: {', '.join(STREAMING_FORMATS)}")
+    since = None
+    if request.GET.get("since"):
+        try:
+            since = parse_watermark(request.GET["since"])
+        except ValueError as exc:
+            return HttpResponseBadRequest(str(exc))
+    course_ids = None
+    if request.GET.getlist("course"):
+        course_ids = list(Course.objects.filter(code__in=request.GET.getlist("course")).values_list("id", flat=True))
+
+    until = export_watermark()
+    response = StreamingHttpResponse(
+        iter_export(grade_book_rows(since=since, until=until, course_ids=course_ids), fmt),
+        content_type=CONTENT_TYPES[fmt],
+    )
+    response["Content-Disposition"] = f'attachment; filename="grade-book.{fmt}"'
+    # Pass this back as ?since= on the next run to fetch only later changes.
+    response["X-Export-Watermark"] = until.isoformat()
+    return response
@@ -1,5 +1,3 @@
-import csv
-import io
 from decimal import Decimal
 from functools import wraps
 
@@ -9,19 +7,30 @@ from django.db import transaction
 from django.contrib import messages
 from django.urls import reverse
 from django.conf import settings
-from django.http import HttpResponseForbidden
+from django.http import HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.template.loader import get_template, render_to_string
 from django.core.exceptions import PermissionDenied
 from django.contrib.auth.views import redirect_to_login
-from django.db.models import Avg
+from django.core.paginator import Paginator
+from django.db.models import Avg, Count, DecimalField, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.forms import modelformset_factory
 
+from .audit import SOURCE_GRADE_ENTRY, audit_context
+from .bulk import upsert_grades
+from .imports import import_grade_csv
 from .models import Grade
+from .stats import course_grade_statistics
 from courses.models import Course, Assessment, Enrollment
 from outcomes.models import LearningOutcome
 from feedback.models import FeedbackRequest
+from jobs.runner import enqueue, spool_upload
 
 DEFAULT_MAX_UPLOAD_BYTES = getattr(settings, "GRADE_CSV_MAX_BYTES", 5 * 1024 * 1024)
 ALLOWED_UPLOAD_EXTENSIONS = getattr(settings, "GRADE_CSV_ALLOWED_EXT", (".csv",))
+FEEDBACK_REQUESTS_PER_PAGE = 20
+GRADE_GRID_CHUNK_ROWS = 100
+GRADE_GRID_ROWS_MARKER = "<!-- grade-grid-rows -->"
 
 
 def permission_or_staff_required(perm_codename: str):
@@ -46,6 +55,41 @@ def _user_can_manage_course(user, course: Course) -> bool:
     return course.instructor_id == user.id
 
 
+def _per_course(queryset, course_path, aggregate, output_field):
+    """`aggregate` over `queryset` grouped by course, correlated with the outer course row."""
+    return Subquery(
+        queryset.filter(**{course_path: OuterRef("pk")})
+        .order_by()
+        .values(course_path)
+        .annotate(value=aggregate)
+        .values("value"),
+        output_field=output_field,
+    )
+
+
+def annotate_course_stats(courses):
+    """
+    Add enrolled_count, assessment_count, graded_count and average_score to
+    each course. Grades still at the 0.00 placeholder the entry grid creates
+    count as ungraded. Every statistic is a correlated grouped subquery, so
+    the courses come back in one query without the row fan-out a join over
+    enrollments x grades would cause.
+    """
+    graded = Grade.objects.exclude(score_percentage=0)
+
+    def count(queryset, course_path):
+        return Coalesce(_per_course(queryset, course_path, Count("*"), IntegerField()), Value(0))
+
+    return courses.annotate(
+        enrolled_count=count(Enrollment.objects.all(), "course"),
+        assessment_count=count(Assessment.objects.all(), "course"),
+        graded_count=count(graded, "assessment__course"),
+        average_score=_per_course(
+            graded, "assessment__course", Avg("score_percentage"), DecimalField(max_digits=5, decimal_places=2)
+        ),
+    )
+
+
 @login_required
 def teacher_dashboard(request):
     user = request.user
@@ -53,16 +97,21 @@ def teacher_dashboard(request):
         return HttpResponseForbidden()
 
     my_courses = Course.objects.all() if user.is_staff else Course.objects.filter(instructor=user)
+    courses = list(annotate_course_stats(my_courses).order_by("code"))
+    for course in courses:
+        expected = course.enrolled_count * course.assessment_count
+        course.grading_completeness = min(100, round(course.graded_count * 100 / expected)) if expected else None
 
     feedback_requests = FeedbackRequest.objects.filter(
         assessment__course__in=my_courses,
         is_resolved=False
-    ).select_related("student", "assessment").order_by("-request_date")
+    ).select_related("student", "assessment__course").order_by("-request_date", "-id")
+    page = Paginator(feedback_requests, FEEDBACK_REQUESTS_PER_PAGE).get_page(request.GET.get("page"))
 
     return render(request, "grades/teacher/dashboard.html", {
-        "my_courses": my_courses.order_by("code"),
-        "feedback_requests": feedback_requests,
-        "total_courses": my_courses.count(),
+        "my_courses": courses,
+        "feedback_requests": page,
+        "total_courses": len(courses),
     })
 
 
@@ -81,41 +130,44 @@ def teacher_grade_entry(request, course_id):
         return HttpResponseForbidden()
 
     assessments = list(course.assessments.all().order_by("type"))
-    students = [e.student for e in Enrollment.objects.filter(course=course).select_related("student")]
-
-    # Ensure grade rows exist (one grade per student x assessment)
-    with transaction.atomic():
-        for student in students:
-            for assessment in assessments:
-                Grade.objects.get_or_create(
-                    student=student,
-                    assessment=assessment,
-                    defaults={"score_percentage": Decimal("0.00")}
-                )
+    students = list(
+        Enrollment.objects.filter(course=course)
+        .order_by("id")
+        .values_list("student_id", "student__username", "student__first_name", "student__last_name")
+    )
 
     if request.method == "POST":
-        updated = 0
+        # One query for every existing cell; new and changed cells are written in bulk.
+        existing = {
+            (g.student_id, g.assessment_id): g
+            for g in Grade.objects.filter(assessment__course=course)
+        }
+        changes = {}
         errors = []
-        for student in students:
+        for student_id, username, _, _ in students:
             for assessment in assessments:
-                key = f"score_{student.id}_{assessment.id}"
+                key = f"score_{student_id}_{assessment.id}"
                 raw = request.POST.get(key, "").strip()
                 if raw == "":
                     continue
                 try:
                     val = Decimal(raw)
-                    if val < 0 or val > 100:
+                    if val < 0 or val > 100 or val.as_tuple().exponent < -2:
                         raise ValueError
                 except Exception:
-                    errors.append(f"Invalid score for {student.username} / {assessment.get_type_display()}")
+                    errors.append(f"Invalid score for {username} / {assessment.get_type_display()}")
                     continue
 
-                Grade.objects.filter(student=student, assessment=assessment).update(score_percentage=val)
-                updated += 1
+                grade = existing.get((student_id, assessment.id))
+                if grade is None or grade.score_percentage != val:
+                    changes[(student_id, assessment.id)] = val
+
+        with transaction.atomic(), audit_context(request.user, SOURCE_GRADE_ENTRY):
+            created, updated = upsert_grades(changes, existing=existing)
 
         for e in errors:
             messages.error(request, e)
-        if updated:
+        if created or updated:
             messages.success(request, "Grades updated successfully.")
         else:
             if not errors:
@@ -123,18 +175,76 @@ def teacher_grade_entry(request, course_id):
 
         return redirect(reverse("grades:teacher_grade_entry", args=[course.id]))
 
-    # Build nested scores dict for pre-filling inputs: scores[student_id][assessment_id] = score
-    scores = {}
-    qs = Grade.objects.filter(assessment__course=course)
-    for g in qs:
-        scores.setdefault(g.student_id, {})[g.assessment_id] = g.score_percentage
-
-    return render(request, "grades/teacher/grade_entry.html", {
+    # Rendering only needs the scores, so they are read as tuples rather than
+    # Grade instances; cells without a grade yet are created in bulk at 0.00.
+    scores = {
+        (student_id, assessment_id): score
+        for student_id, assessment_id, score in Grade.objects.filter(assessment__course=course)
+        .values_list("student_id", "assessment_id", "score_percentage")
+    }
+    missing = {
+        (student_id, assessment.id): Decimal("0.00")
+        for student_id, *_ in students
+        for assessment in assessments
+        if (student_id, assessment.id) not in scores
+    }
+    if missing:
+        with transaction.atomic(), audit_context(request.user, SOURCE_GRADE_ENTRY):
+            upsert_grades(missing, existing={})
+        scores.update(missing)
+
+    stats = course_grade_statistics(course.id)
+    by_assessment = {row["id"]: row for row in stats["assessments"]}
+    for assessment in assessments:
+        assessment.stats = by_assessment.get(assessment.id)
+        if assessment.stats:
+            histogram = assessment.stats["histogram"]
+            peak = max(histogram["counts"]) or 1
+            assessment.histogram_bars = [
+                (edge, count, round(count * 100 / peak))
+                for edge, count in zip(histogram["edges"], histogram["counts"])
+            ]
+
+    # The page around the grid is rendered now (so messages are consumed and the
+    # CSRF cookie is set before the response starts); the rows, pre-built as
+    # plain tuples, are streamed behind it in chunks so large sections paint early.
+    page = render_to_string("grades/teacher/grade_entry.html", {
         "course": course,
         "students": students,
         "assessments": assessments,
-        "scores": scores,
-    })
+        "course_stats": stats["course"],
+        "grid_rows_marker": GRADE_GRID_ROWS_MARKER,
+    }, request=request)
+    head, _, tail = page.partition(GRADE_GRID_ROWS_MARKER)
+    rows = [
+        (
+            f"{first_name} {last_name}".strip() or username,
+            [
+                (f"score_{student_id}_{assessment.id}", scores[(student_id, assessment.id)])
+                for assessment in assessments
+            ],
+        )
+        for student_id, username, first_name, last_name in students
+    ]
+    rows_template = get_template("grades/teacher/_grade_entry_rows.html")
+
+    def stream():
+        yield head
+        for start in range(0, len(rows), GRADE_GRID_CHUNK_ROWS):
+            yield rows_template.render({"rows": rows[start:start + GRADE_GRID_CHUNK_ROWS]})
+        yield tail
+
+    return StreamingHttpResponse(stream())
+
+
+@CAN_GRADE_DECORATOR
+@login_required
+def teacher_grade_statistics(request, course_id):
+    """Score distribution of the course and each of its assessments as JSON (see grades.stats)."""
+    course = get_object_or_404(Course, pk=course_id)
+    if not _user_can_manage_course(request.user, course):
+        return HttpResponseForbidden()
+    return JsonResponse({"course_id": course.id, **course_grade_statistics(course.id)})
 
 
 @login_required
@@ -166,7 +276,7 @@ def teacher_grade_entry_single(request, course_id: int):
     assessment = get_object_or_404(Assessment, pk=assessment_id, course=course)
     students = [e.student for e in Enrollment.objects.filter(course=course).select_related("student")]
 
-    with transaction.atomic():
+    with transaction.atomic(), audit_context(request.user, SOURCE_GRADE_ENTRY):
         for s in students:
             Grade.objects.get_or_create(
                 student=s,
@@ -180,7 +290,8 @@ def teacher_grade_entry_single(request, course_id: int):
     if request.method == "POST":
         formset = GradeFormSet(request.POST, queryset=qs)
         if formset.is_valid():
-            formset.save()
+            with transaction.atomic(), audit_context(request.user, SOURCE_GRADE_ENTRY):
+                formset.save()
             messages.success(request, "Grades updated.")
             return redirect(f"{reverse('grades:teacher_grade_entry_single', args=[course_id])}?assessment={assessment.id}")
         else:
@@ -213,36 +324,31 @@ def teacher_grade_bulk_upload(request, course_id):
             messages.error(request, f"Invalid file extension. Allowed: {', '.join(ALLOWED_UPLOAD_EXTENSIONS)}")
             return redirect(request.path)
 
-        try:
-            data = csvfile.read().decode("utf-8")
-        except Exception:
-            messages.error(request, "Could not read the uploaded CSV file.")
-            return redirect(request.path)
+        if csvfile.size > getattr(settings, "ASYNC_UPLOAD_THRESHOLD_BYTES", 1024 * 1024):
+            job = enqueue(
+                "grades.import_csv",
+                {"course_id": course.id, "path": spool_upload(csvfile)},
+                user=request.user,
+            )
+            messages.info(
+                request,
+                f"Large file queued as background job #{job.id}. Progress: {reverse('jobs:status', args=[job.id])}",
+            )
+            return redirect(reverse("grades:teacher_grade_entry", args=[course.id]))
 
-        reader = csv.DictReader(io.StringIO(data))
-        success = 0
-        with transaction.atomic():
-            for row in reader:
-                try:
-                    username = (row.get("username") or row.get("student_username") or "").strip()
-                    assessment_id = (row.get("assessment_id") or "").strip()
-                    score_str = (row.get("score") or row.get("score_percentage") or "").strip()
-                    if not (username and assessment_id and score_str):
-                        continue
-                    from django.contrib.auth import get_user_model
-                    User = get_user_model()
-                    student = User.objects.get(username=username)
-                    assessment = Assessment.objects.get(pk=int(assessment_id), course=course)
-                    Grade.objects.update_or_create(
-                        student=student,
-                        assessment=assessment,
-                        defaults={"score_percentage": Decimal(score_str)},
-                    )
-                    success += 1
-                except Exception:
-                    continue
+        report = import_grade_csv(csvfile, course, changed_by=request.user)
 
-        messages.success(request, f"{success} grades imported.")
+        if report.created or report.updated:
+            messages.success(
+                request,
+                f"{report.created} grades created, {report.updated} updated, {report.unchanged} unchanged.",
+            )
+        elif not report.errors:
+            messages.info(request, "No changes detected.")
+        if report.errors:
+            messages.warning(request, f"{len(report.errors)} line(s) could not be imported.")
+            for line, message in report.errors[:20]:
+                messages.warning(request, f"Line {line}: {message}")
         return redirect(reverse("grades:teacher_grade_entry", args=[course.id]))
 
     return render(request, "grades/teacher/bulk_upload.html", {"course": course})
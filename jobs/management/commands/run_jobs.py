@@ -0,0 +1,105 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.models import Job, JobStatus
+from jobs.runner import claim_next_job, fail_job, fail_stale_jobs, release_job, run_job, run_pending_jobs
+
+
+def _init_worker(settings_module):
+    # Forked children must not reuse the parent's DB connections; spawned
+    # children need Django configured from scratch.
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
+    connections.close_all()
+
+
+def _run_in_worker(job_id):
+    try:
+        return run_job(job_id)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs with a pool of worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2,
+                            help="Worker processes; 0 runs jobs inline in this process.")
+        parser.add_argument('--poll', type=float, default=1.0,
+                            help="Seconds to sleep when the queue is empty.")
+        parser.add_argument('--once', action='store_true',
+                            help="Exit once the queue is drained instead of polling forever.")
+        parser.add_argument('--stale-after', type=int,
+                            default=getattr(settings, 'JOBS_STALE_AFTER_SECONDS', 6 * 60 * 60),
+                            help="On startup, fail RUNNING jobs started more than this many seconds ago.")
+
+    def handle(self, *args, **options):
+        workers, poll, once = options['workers'], options['poll'], options['once']
+        stale = fail_stale_jobs(timedelta(seconds=options['stale_after']))
+        if stale:
+            self.stderr.write(f"Failed {len(stale)} stale running job(s): {', '.join(f'#{i}' for i in stale)}.")
+        if workers <= 0:
+            while True:
+                done = run_pending_jobs()
+                if done:
+                    self.stdout.write(f"Ran {done} job(s).")
+                if once:
+                    return
+                time.sleep(poll)
+
+        connections.close_all()
+        settings_module = os.environ.get('DJANGO_SETTINGS_MODULE', 'Acumie.settings')
+
+        def new_pool():
+            return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(settings_module,))
+
+        running = {}  # future -> job id
+        pool = new_pool()
+        try:
+            while True:
+                if self._reap(running):
+                    # A worker died; every future of the old pool is failed
+                    # once it has shut down, and a fresh pool takes over.
+                    pool.shutdown(wait=True)
+                    self._reap(running)
+                    pool = new_pool()
+                while len(running) < workers:
+                    job_id = claim_next_job()
+                    if job_id is None:
+                        break
+                    try:
+                        future = pool.submit(_run_in_worker, job_id)
+                    except BrokenProcessPool:
+                        release_job(job_id)
+                        pool.shutdown(wait=True)
+                        self._reap(running)
+                        pool = new_pool()
+                        break
+                    running[future] = job_id
+                    self.stdout.write(f"Started job #{job_id}.")
+                if once and not running and not Job.objects.filter(status=JobStatus.QUEUED).exists():
+                    return
+                time.sleep(poll if not running else min(poll, 0.2))
+        finally:
+            pool.shutdown(wait=True)
+
+    def _reap(self, running):
+        """Record finished futures; a job whose worker failed is marked FAILED. True if the pool broke."""
+        broken = False
+        for future in [f for f in running if f.done()]:
+            job_id = running.pop(future)
+            error = future.exception()
+            if error is not None:
+                broken = broken or isinstance(error, BrokenProcessPool)
+                self.stderr.write(f"Worker error in job #{job_id}: {error!r}")
+                fail_job(job_id, f"Worker error: {error!r}")
+        return broken
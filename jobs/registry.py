@@ -0,0 +1,27 @@
+_handlers = {}
+
+
+def register(kind):
+    """
+    Register a job handler under `kind`:
+
+        @register("grades.import_csv")
+        def import_csv(job, payload):
+            ...
+            return {"created": 10}
+
+    The handler receives the Job and its payload and returns a JSON-serializable result.
+    """
+    def decorator(func):
+        if kind in _handlers and _handlers[kind] is not func:
+            raise ValueError(f"A job handler is already registered for '{kind}'.")
+        _handlers[kind] = func
+        return func
+    return decorator
+
+
+def get_handler(kind):
+    try:
+        return _handlers[kind]
+    except KeyError:
+        raise LookupError(f"No job handler registered for '{kind}'.")
@@ -0,0 +1,134 @@
+import logging
+import os
+import traceback
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Job, JobStatus
+from .registry import get_handler
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(kind, payload=None, user=None):
+    get_handler(kind)  # fail fast on typos instead of leaving a job nobody can run
+    return Job.objects.create(
+        kind=kind,
+        payload=payload or {},
+        created_by=user if user is not None and user.is_authenticated else None,
+    )
+
+
+def spool_upload(uploaded_file):
+    """Copy an upload to the job spool directory so a worker process can read it later."""
+    spool_dir = Path(settings.JOBS_SPOOL_DIR)
+    spool_dir.mkdir(parents=True, exist_ok=True)
+    suffix = Path(getattr(uploaded_file, 'name', '') or '').suffix
+    path = spool_dir / f"{uuid.uuid4().hex}{suffix}"
+    with open(path, 'wb') as out:
+        for chunk in uploaded_file.chunks():
+            out.write(chunk)
+    return str(path)
+
+
+def discard_spooled_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def claim_next_job():
+    """
+    Atomically move the oldest queued job to RUNNING. The conditional UPDATE
+    makes concurrent workers safe without row locks, which SQLite lacks.
+    """
+    while True:
+        job_id = (
+            Job.objects.filter(status=JobStatus.QUEUED)
+            .order_by('created_at', 'pk')
+            .values_list('pk', flat=True)
+            .first()
+        )
+        if job_id is None:
+            return None
+        claimed = Job.objects.filter(pk=job_id, status=JobStatus.QUEUED).update(
+            status=JobStatus.RUNNING, started_at=timezone.now()
+        )
+        if claimed:
+            return job_id
+
+
+def release_job(job_id):
+    """Put a claimed job that never reached a worker back in the queue."""
+    return Job.objects.filter(pk=job_id, status=JobStatus.RUNNING).update(
+        status=JobStatus.QUEUED, started_at=None
+    )
+
+
+def fail_job(job_id, error):
+    """
+    Mark a RUNNING job FAILED with `error`, for jobs whose worker died before
+    run_job could record an outcome. A spooled upload in the payload is
+    removed, since the handler's own cleanup never ran.
+    """
+    failed = Job.objects.filter(pk=job_id, status=JobStatus.RUNNING).update(
+        status=JobStatus.FAILED, error=error, result=None, finished_at=timezone.now()
+    )
+    if failed:
+        path = (Job.objects.values_list('payload', flat=True).get(pk=job_id) or {}).get('path')
+        if path and Path(path).resolve().parent == Path(settings.JOBS_SPOOL_DIR).resolve():
+            discard_spooled_file(path)
+    return failed
+
+
+def fail_stale_jobs(stale_after=None):
+    """
+    Fail RUNNING jobs started more than `stale_after` (a timedelta; default
+    settings.JOBS_STALE_AFTER_SECONDS) ago. Call when a worker starts, before
+    it claims anything. Returns the failed job ids.
+    """
+    if stale_after is None:
+        stale_after = timedelta(seconds=getattr(settings, 'JOBS_STALE_AFTER_SECONDS', 6 * 60 * 60))
+    cutoff = timezone.now() - stale_after
+    stale = list(
+        Job.objects.filter(status=JobStatus.RUNNING, started_at__lt=cutoff).values_list('pk', 'started_at')
+    )
+    return [
+        job_id for job_id, started_at in stale
+        if fail_job(job_id, f"Worker stopped before the job finished (running since {started_at.isoformat()}).")
+    ]
+
+
+def run_job(job_id):
+    """Execute one claimed job and record its outcome; returns the final status."""
+    job = Job.objects.get(pk=job_id)
+    try:
+        result = get_handler(job.kind)(job, job.payload)
+    except Exception:
+        logger.exception("Job %s (%s) failed", job.pk, job.kind)
+        job.status = JobStatus.FAILED
+        job.error = traceback.format_exc()
+        job.result = None
+    else:
+        job.status = JobStatus.SUCCEEDED
+        job.result = result
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'result', 'error', 'finished_at'])
+    return job.status
+
+
+def run_pending_jobs(limit=None):
+    """Run queued jobs inline in this process (worker with --workers 0, tests)."""
+    count = 0
+    while limit is None or count < limit:
+        job_id = claim_next_job()
+        if job_id is None:
+            break
+        run_job(job_id)
+        count += 1
+    return count
@@ -0,0 +1,228 @@
+import json
+import os
+import tempfile
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+from functools import partial
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from courses.imports import import_enrollments
+from courses.models import Course, Assessment, Enrollment
+from grades.imports import import_grade_csv
+from grades.models import Grade
+from .models import Job, JobStatus
+from .registry import register
+from .runner import enqueue, run_job, run_pending_jobs, spool_upload
+
+User = get_user_model()
+
+
+@register("jobs.tests.explode")
+def explode(job, payload):
+    raise RuntimeError("boom")
+
+
+@register("jobs.tests.noop")
+def noop(job, payload):
+    return {"ok": True}
+
+
+class FakePool:
+    """
+    In-process stand-in for ProcessPoolExecutor: jobs run inline, a job with
+    {"die": true} breaks the pool the way a killed worker process does.
+    """
+    instances = []
+    broken_on_start = 0
+
+    def __init__(self, max_workers, initializer=None, initargs=()):
+        FakePool.instances.append(self)
+        self.broken = len(FakePool.instances) <= FakePool.broken_on_start
+
+    def submit(self, fn, job_id):
+        if self.broken:
+            raise BrokenProcessPool("A child process terminated abruptly, the process pool is not usable anymore")
+        future = Future()
+        if Job.objects.get(pk=job_id).payload.get("die"):
+            self.broken = True
+            future.set_exception(BrokenProcessPool("A process in the process pool was terminated abruptly"))
+        else:
+            future.set_result(run_job(job_id))
+        return future
+
+    def shutdown(self, wait=True):
+        pass
+
+
+class JobRunnerTest(TestCase):
+    def setUp(self):
+        self.spool = tempfile.TemporaryDirectory()
+        self.addCleanup(self.spool.cleanup)
+        self.instructor = User.objects.create_user(username='teacher', password='x', role='INSTRUCTOR')
+        self.student = User.objects.create_user(username='ada', password='x', role='STUDENT')
+        self.course = Course.objects.create(code="CSE404", title="Distributed Systems", ects_credit=5, instructor=self.instructor)
+        self.quiz = Assessment.objects.create(type="QUIZ", course=self.course, weight_percentage=100)
+
+    def test_queued_grade_import_runs_in_worker(self):
+        upload = SimpleUploadedFile("grades.csv", f"username,assessment_id,score\nada,{self.quiz.id},91\n".encode())
+        with override_settings(JOBS_SPOOL_DIR=self.spool.name):
+            path = spool_upload(upload)
+        job = enqueue("grades.import_csv", {"course_id": self.course.id, "path": path}, user=self.instructor)
+        self.assertEqual(job.status, JobStatus.QUEUED)
+
+        call_command('run_jobs', workers=0, once=True, stdout=StringIO())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, JobStatus.SUCCEEDED)
+        self.assertEqual(job.result["created"], 1)
+        self.assertEqual(job.progress, 1)
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(Grade.objects.get(student=self.student).score_percentage, 91)
+
+    def test_failure_is_recorded(self):
+        job = enqueue("jobs.tests.explode")
+        self.assertEqual(run_pending_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, JobStatus.FAILED)
+        self.assertIn("boom", job.error)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_unknown_kind_is_rejected(self):
+        with self.assertRaises(LookupError):
+            enqueue("jobs.tests.missing")
+
+    def test_status_endpoint(self):
+        job = enqueue("jobs.tests.explode", user=self.instructor)
+        url = reverse('jobs:status', args=[job.id])
+
+        self.client.force_login(self.student)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.force_login(self.instructor)
+        data = json.loads(self.client.get(url).content)
+        self.assertEqual((data["id"], data["status"]), (job.id, "QUEUED"))
+
+    def test_large_upload_is_queued(self):
+        self.client.force_login(self.instructor)
+        upload = SimpleUploadedFile("grades.csv", f"username,assessment_id,score\nada,{self.quiz.id},55\n".encode())
+        with override_settings(JOBS_SPOOL_DIR=self.spool.name, ASYNC_UPLOAD_THRESHOLD_BYTES=0):
+            self.client.post(reverse('grades:teacher_grade_bulk_upload', args=[self.course.id]), {"csv_file": upload})
+        self.assertFalse(Grade.objects.exists())
+
+        run_pending_jobs()
+        job = Job.objects.get(kind="grades.import_csv")
+        self.assertEqual(job.status, JobStatus.SUCCEEDED)
+        self.assertEqual(Grade.objects.get(student=self.student).score_percentage, 55)
+
+
+class WorkerRecoveryTest(TestCase):
+    def setUp(self):
+        FakePool.instances = []
+        FakePool.broken_on_start = 0
+        patcher = mock.patch('jobs.management.commands.run_jobs.ProcessPoolExecutor', FakePool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_worker(self, **options):
+        err = StringIO()
+        call_command('run_jobs', workers=1, poll=0, once=True, stdout=StringIO(), stderr=err, **options)
+        return err.getvalue()
+
+    def test_dead_worker_fails_its_job_and_pool_is_rebuilt(self):
+        spool = tempfile.TemporaryDirectory()
+        self.addCleanup(spool.cleanup)
+        with override_settings(JOBS_SPOOL_DIR=spool.name):
+            path = spool_upload(SimpleUploadedFile("upload.csv", b"username\n"))
+            dead = enqueue("jobs.tests.noop", {"die": True, "path": path})
+            alive = enqueue("jobs.tests.noop")
+            self.run_worker()
+        dead.refresh_from_db()
+        alive.refresh_from_db()
+        self.assertEqual(dead.status, JobStatus.FAILED)
+        self.assertIn("terminated abruptly", dead.error)
+        self.assertIsNotNone(dead.finished_at)
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(alive.status, JobStatus.SUCCEEDED)
+        self.assertEqual(len(FakePool.instances), 2)
+
+    def test_job_is_not_lost_when_submit_fails(self):
+        FakePool.broken_on_start = 1
+        job = enqueue("jobs.tests.noop")
+        self.run_worker()
+        job.refresh_from_db()
+        self.assertEqual(job.status, JobStatus.SUCCEEDED)
+        self.assertEqual(len(FakePool.instances), 2)
+
+    def test_stale_running_jobs_are_failed_on_startup(self):
+        stale = enqueue("jobs.tests.noop")
+        recent = enqueue("jobs.tests.noop")
+        Job.objects.filter(pk=stale.pk).update(status=JobStatus.RUNNING, started_at=timezone.now() - timedelta(hours=2))
+        Job.objects.filter(pk=recent.pk).update(status=JobStatus.RUNNING, started_at=timezone.now())
+        err = self.run_worker(stale_after=3600)
+        self.assertIn(f"#{stale.pk}", err)
+        stale.refresh_from_db()
+        recent.refresh_from_db()
+        self.assertEqual(stale.status, JobStatus.FAILED)
+        self.assertIn("Worker stopped", stale.error)
+        self.assertEqual(recent.status, JobStatus.RUNNING)
+
+
+class JobProgressVisibilityTest(TransactionTestCase):
+    """Progress written by an import job must be readable by other connections while it runs."""
+
+    def setUp(self):
+        self.spool = tempfile.TemporaryDirectory()
+        self.addCleanup(self.spool.cleanup)
+        self.instructor = User.objects.create_user(username='teacher', password='x', role='INSTRUCTOR')
+        self.students = [User.objects.create_user(username=f's{i}', password='x', role='STUDENT') for i in range(30)]
+        self.course = Course.objects.create(code="CSE405", title="Databases", ects_credit=5, instructor=self.instructor)
+        self.quiz = Assessment.objects.create(type="QUIZ", course=self.course, weight_percentage=100)
+        self.observer = connections.create_connection('default')
+        self.addCleanup(self.observer.close)
+
+    def run_observed(self, kind, payload):
+        job = enqueue(kind, payload, user=self.instructor)
+        seen = []
+        set_progress = Job.set_progress
+
+        def observed(job, progress, total=None):
+            set_progress(job, progress, total)
+            with self.observer.cursor() as cursor:
+                cursor.execute("SELECT progress FROM jobs_job WHERE id = %s", [job.pk])
+                seen.append((progress, cursor.fetchone()[0]))
+
+        with mock.patch.object(Job, 'set_progress', observed):
+            run_pending_jobs()
+        job.refresh_from_db()
+        self.assertEqual(job.status, JobStatus.SUCCEEDED, job.error)
+        return seen
+
+    def spool_csv(self, body):
+        with override_settings(JOBS_SPOOL_DIR=self.spool.name):
+            return spool_upload(SimpleUploadedFile("upload.csv", body.encode()))
+
+    def test_grade_import_progress(self):
+        body = "username,assessment_id,score\n" + "".join(f"{s.username},{self.quiz.id},70\n" for s in self.students)
+        path = self.spool_csv(body)
+        with mock.patch('grades.tasks.import_grade_csv', partial(import_grade_csv, batch_size=10)):
+            seen = self.run_observed("grades.import_csv", {"course_id": self.course.id, "path": path})
+        self.assertEqual(seen[:3], [(10, 10), (20, 20), (30, 30)])
+        self.assertEqual(Grade.objects.count(), 30)
+
+    def test_bulk_enroll_progress(self):
+        body = "username,course_code\n" + "".join(f"{s.username},{self.course.code}\n" for s in self.students)
+        path = self.spool_csv(body)
+        with mock.patch('courses.tasks.import_enrollments', partial(import_enrollments, batch_size=10)):
+            seen = self.run_observed("courses.bulk_enroll", {"path": path})
+        self.assertEqual(seen[:3], [(10, 10), (20, 20), (30, 30)])
+        self.assertEqual(Enrollment.objects.count(), 30)
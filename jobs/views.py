@@ -0,0 +1,13 @@
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+
+from .models import Job
+
+
+@login_required
+def job_status_view(request, job_id):
+    job = get_object_or_404(Job, pk=job_id)
+    if not (request.user.is_staff or job.created_by_id == request.user.id):
+        return JsonResponse({'status': 'error', 'message': "You cannot view this job."}, status=403)
+    return JsonResponse(job.as_dict())
@@ -0,0 +1,15 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from outcomes.weights import rebuild_assessment_po_weights
+
+
+class Command(BaseCommand):
+    help = "Recompute the assessment -> PO effective weight index."
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = rebuild_assessment_po_weights()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} assessment-PO weight(s) in {elapsed:.2f}s."))
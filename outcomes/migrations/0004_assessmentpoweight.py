@@ -0,0 +1,64 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:09
+
+import django.db.models.deletion
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+def populate_weights(apps, schema_editor):
+    AssessmentLearningOutcome = apps.get_model('courses', 'AssessmentLearningOutcome')
+    LO_PO_Contribution = apps.get_model('outcomes', 'LO_PO_Contribution')
+    AssessmentPOWeight = apps.get_model('outcomes', 'AssessmentPOWeight')
+    hundred = Decimal(100)
+
+    lo_pos = defaultdict(list)
+    for lo_id, po_id, pct in LO_PO_Contribution.objects.values_list(
+        'learning_outcome_id', 'program_outcome_id', 'contribution_percentage'
+    ):
+        lo_pos[lo_id].append((po_id, Decimal(pct)))
+
+    weights = defaultdict(Decimal)
+    for a_id, lo_id, alo_pct, weight_pct, ects in AssessmentLearningOutcome.objects.values_list(
+        'assessment_id', 'learning_outcome_id', 'contribution_percentage',
+        'assessment__weight_percentage', 'assessment__course__ects_credit',
+    ):
+        for po_id, po_pct in lo_pos[lo_id]:
+            weights[(a_id, po_id)] += (
+                Decimal(weight_pct) / hundred * Decimal(alo_pct) / hundred * po_pct / hundred * Decimal(ects)
+            )
+
+    AssessmentPOWeight.objects.bulk_create(
+        [
+            AssessmentPOWeight(assessment_id=a_id, program_outcome_id=po_id, effective_weight=weight)
+            for (a_id, po_id), weight in weights.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0009_alter_assessment_learning_outcomes'),
+        ('outcomes', '0003_alter_learningoutcome_code'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssessmentPOWeight',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('effective_weight', models.DecimalField(decimal_places=14, max_digits=18, verbose_name='Effective Weight')),
+                ('assessment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='po_weights', to='courses.assessment', verbose_name='Assessment')),
+                ('program_outcome', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assessment_weights', to='outcomes.programoutcome', verbose_name='Program Outcome')),
+            ],
+            options={
+                'verbose_name': 'Assessment-PO Weight',
+                'verbose_name_plural': 'Assessment-PO Weights',
+                'unique_together': {('assessment', 'program_outcome')},
+            },
+        ),
+        migrations.RunPython(populate_weights, migrations.RunPython.noop),
+    ]
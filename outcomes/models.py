@@ -86,4 +86,36 @@ class LO_PO_Contribution(models.Model):
         unique_together = ('learning_outcome', 'program_outcome') 
 
     def __str__(self):
-        return f"{self.learning_outcome.code} -> {self.program_outcome.code}: {self.contribution_percentage}%"
\ No newline at end of file
+        return f"{self.learning_outcome.code} -> {self.program_outcome.code}: {self.contribution_percentage}%"
+
+class AssessmentPOWeight(models.Model):
+    """
+    Derived index: how much one assessment feeds one PO, i.e.
+    assessment weight x ALO% x LO->PO% x course ECTS summed over the linking LOs.
+    Maintained by outcomes.signals; rebuild with `manage.py rebuild_po_weights`.
+    """
+    assessment = models.ForeignKey(
+        'courses.Assessment',
+        on_delete=models.CASCADE,
+        related_name='po_weights',
+        verbose_name="Assessment"
+    )
+    program_outcome = models.ForeignKey(
+        ProgramOutcome,
+        on_delete=models.CASCADE,
+        related_name='assessment_weights',
+        verbose_name="Program Outcome"
+    )
+    effective_weight = models.DecimalField(
+        max_digits=18,
+        decimal_places=14,
+        verbose_name="Effective Weight"
+    )
+
+    class Meta:
+        verbose_name = "Assessment-PO Weight"
+        verbose_name_plural = "Assessment-PO Weights"
+        unique_together = ('assessment', 'program_outcome')
+
+    def __str__(self):
+        return f"{self.assessment_id} -> {self.program_outcome_id}: {self.effective_weight}"
@@ -0,0 +1,48 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from courses.models import Assessment, AssessmentLearningOutcome, Course
+from .models import LO_PO_Contribution
+from .weights import rebuild_assessment_po_weights
+
+
+def _cascaded_from(origin, *models):
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return origin is not None and origin_model in models
+
+
+@receiver(post_save, sender=Assessment)
+def assessment_saved_rebuild_weights(sender, instance: Assessment, created: bool, **kwargs):
+    if created:
+        return
+    rebuild_assessment_po_weights([instance.pk])
+
+
+@receiver(post_save, sender=Course)
+def course_saved_rebuild_weights(sender, instance: Course, created: bool, **kwargs):
+    # ECTS credit is part of every effective weight of the course.
+    if created:
+        return
+    rebuild_assessment_po_weights(instance.assessments.values_list('id', flat=True))
+
+
+@receiver(post_save, sender=AssessmentLearningOutcome)
+@receiver(post_delete, sender=AssessmentLearningOutcome)
+def alo_changed_rebuild_weights(sender, instance: AssessmentLearningOutcome, origin=None, **kwargs):
+    # Deleting the assessment (or its course) drops its index rows by cascade.
+    if _cascaded_from(origin, Assessment, Course):
+        return
+    rebuild_assessment_po_weights([instance.assessment_id])
+
+
+@receiver(post_save, sender=LO_PO_Contribution)
+@receiver(post_delete, sender=LO_PO_Contribution)
+def lo_po_changed_rebuild_weights(sender, instance: LO_PO_Contribution, origin=None, **kwargs):
+    if _cascaded_from(origin, Course):
+        return
+    rebuild_assessment_po_weights(
+        AssessmentLearningOutcome.objects.filter(
+            learning_outcome_id=instance.learning_outcome_id
+        ).values_list('assessment_id', flat=True)
+    )
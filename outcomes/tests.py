@@ -1,5 +1,9 @@
+from decimal import Decimal
+
 from django.test import TestCase
-from outcomes.models import ProgramOutcome
+from courses.models import Course, Assessment, AssessmentLearningOutcome
+from outcomes.models import ProgramOutcome, LearningOutcome, LO_PO_Contribution, AssessmentPOWeight
+from outcomes.weights import rebuild_assessment_po_weights
 
 class OutcomeModelTest(TestCase):
     def setUp(self):
@@ -26,4 +30,46 @@ class OutcomeModelTest(TestCase):
     def test_delete_outcome(self):
         pk = self.outcome.pk
         self.outcome.delete()
-        self.assertFalse(ProgramOutcome.objects.filter(pk=pk).exists())
\ No newline at end of file
+        self.assertFalse(ProgramOutcome.objects.filter(pk=pk).exists())
+
+class AssessmentPOWeightIndexTest(TestCase):
+    def setUp(self):
+        self.course = Course.objects.create(code="CSE331", title="Databases", ects_credit=Decimal("5.00"))
+        self.po = ProgramOutcome.objects.create(code="PO-02", title="Data modelling")
+        self.lo = LearningOutcome.objects.create(course=self.course, title="Normalize schemas")
+        self.assessment = Assessment.objects.create(course=self.course, type="FINAL", weight_percentage=Decimal("60.00"))
+        self.contribution = LO_PO_Contribution.objects.create(
+            learning_outcome=self.lo, program_outcome=self.po, contribution_percentage=Decimal("50.00")
+        )
+        self.alo = AssessmentLearningOutcome.objects.create(
+            assessment=self.assessment, learning_outcome=self.lo, contribution_percentage=Decimal("80.00")
+        )
+
+    def weight(self):
+        return AssessmentPOWeight.objects.get(assessment=self.assessment, program_outcome=self.po).effective_weight
+
+    def test_index_tracks_every_factor(self):
+        # 0.60 * 0.80 * 0.50 * 5
+        self.assertEqual(self.weight(), Decimal("1.2"))
+
+        self.contribution.contribution_percentage = Decimal("25.00")
+        self.contribution.save()
+        self.assertEqual(self.weight(), Decimal("0.6"))
+
+        self.course.ects_credit = Decimal("10.00")
+        self.course.save()
+        self.assertEqual(self.weight(), Decimal("1.2"))
+
+        self.assessment.weight_percentage = Decimal("30.00")
+        self.assessment.save()
+        self.assertEqual(self.weight(), Decimal("0.6"))
+
+    def test_unlinking_removes_rows(self):
+        self.alo.delete()
+        self.assertFalse(AssessmentPOWeight.objects.exists())
+
+    def test_rebuild_matches_incremental_index(self):
+        before = self.weight()
+        AssessmentPOWeight.objects.all().delete()
+        self.assertEqual(rebuild_assessment_po_weights(), 1)
+        self.assertEqual(self.weight(), before)
@@ -0,0 +1,60 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+
+from Acumie.cache import bump_version
+from courses.models import AssessmentLearningOutcome
+from .models import AssessmentPOWeight
+
+HUNDRED = Decimal(100)
+# Cache namespace for anything derived from the assessment -> PO mapping.
+PO_MAPPING_NAMESPACE = "po-mapping"
+
+
+def compute_assessment_po_weights(assessment_ids=None):
+    """
+    Effective weights keyed by (assessment_id, program_outcome_id), read with a
+    single ALO x LO_PO join. Arithmetic stays in Decimal so the stored value is exact.
+    """
+    links = AssessmentLearningOutcome.objects.filter(
+        learning_outcome__lo_po_contribution__isnull=False
+    )
+    if assessment_ids is not None:
+        links = links.filter(assessment_id__in=list(assessment_ids))
+    weights = defaultdict(Decimal)
+    for a_id, po_id, alo_pct, po_pct, weight_pct, ects in links.values_list(
+        'assessment_id',
+        'learning_outcome__lo_po_contribution__program_outcome_id',
+        'contribution_percentage',
+        'learning_outcome__lo_po_contribution__contribution_percentage',
+        'assessment__weight_percentage',
+        'assessment__course__ects_credit',
+    ):
+        weights[(a_id, po_id)] += (
+            Decimal(weight_pct) / HUNDRED * Decimal(alo_pct) / HUNDRED * Decimal(po_pct) / HUNDRED * Decimal(ects)
+        )
+    return weights
+
+
+def rebuild_assessment_po_weights(assessment_ids=None):
+    """Replace the index rows of the given assessments (all when None); returns the row count."""
+    if assessment_ids is not None:
+        assessment_ids = set(assessment_ids)
+        if not assessment_ids:
+            return 0
+    weights = compute_assessment_po_weights(assessment_ids)
+    with transaction.atomic():
+        stale = AssessmentPOWeight.objects.all()
+        if assessment_ids is not None:
+            stale = stale.filter(assessment_id__in=assessment_ids)
+        stale.delete()
+        AssessmentPOWeight.objects.bulk_create(
+            [
+                AssessmentPOWeight(assessment_id=a_id, program_outcome_id=po_id, effective_weight=weight)
+                for (a_id, po_id), weight in weights.items()
+            ],
+            batch_size=1000,
+        )
+        bump_version(PO_MAPPING_NAMESPACE)
+    return len(weights)
@@ -0,0 +1,13 @@
+from jobs.registry import register
+from .utils import get_aggregated_po_report
+
+
+@register("reports.po_report")
+def po_report_job(job, payload):
+    report = get_aggregated_po_report()
+    # Decimal scores are stored as strings so the result stays JSON-serializable.
+    report["data"] = {
+        code: {"score": str(row["score"]), "student_count": row["student_count"]}
+        for code, row in report["data"].items()
+    }
+    return report
@@ -1,6 +1,14 @@
+from decimal import Decimal
+
 from django.test import TestCase
-from courses.models import Course
+from django.urls import reverse
+from courses.models import Course, Assessment, AssessmentLearningOutcome
+from grades.models import Grade
+from outcomes.models import LearningOutcome, LO_PO_Contribution, ProgramOutcome
 from .models import Report
+from .utils import get_aggregated_po_report
+from jobs.models import Job
+from jobs.runner import run_pending_jobs
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -34,4 +42,62 @@ class ReportModelTest(TestCase):
     def test_delete_report(self):
         report_id = self.report.id
         self.report.delete()
-        self.assertFalse(Report.objects.filter(id=report_id).exists())
\ No newline at end of file
+        self.assertFalse(Report.objects.filter(id=report_id).exists())
+
+class AggregatedPOReportTest(TestCase):
+    def setUp(self):
+        self.students = [
+            User.objects.create_user(username=f'student{i}', password='x', role='STUDENT') for i in range(2)
+        ]
+        self.head = User.objects.create_user(username='head', password='x', role='DEPT_HEAD')
+        course = Course.objects.create(title='Algorithms', code='CSE211', ects_credit=6)
+        po = ProgramOutcome.objects.create(code='PO1', title='Problem solving')
+        lo = LearningOutcome.objects.create(course=course, title='Analyse algorithms')
+        LO_PO_Contribution.objects.create(learning_outcome=lo, program_outcome=po, contribution_percentage=80)
+        midterm = Assessment.objects.create(course=course, type='MIDTERM', weight_percentage=40)
+        final = Assessment.objects.create(course=course, type='FINAL', weight_percentage=60)
+        for assessment in (midterm, final):
+            AssessmentLearningOutcome.objects.create(assessment=assessment, learning_outcome=lo, contribution_percentage=100)
+        Grade.objects.create(student=self.students[0], assessment=midterm, score_percentage=70)
+        Grade.objects.create(student=self.students[0], assessment=final, score_percentage=90)
+        Grade.objects.create(student=self.students[1], assessment=midterm, score_percentage=40)
+
+    def test_report_is_weighted_attainment(self):
+        with self.assertNumQueries(1):
+            report = get_aggregated_po_report()
+        self.assertTrue(report['report_available'])
+        # (70*40 + 90*60 + 40*40) / (40 + 60 + 40)
+        self.assertEqual(report['data']['PO1']['score'], Decimal('70.00'))
+        self.assertEqual(report['data']['PO1']['student_count'], 2)
+
+    def test_report_without_grades(self):
+        Grade.objects.all().delete()
+        self.assertFalse(get_aggregated_po_report()['report_available'])
+
+    def test_view_renders_for_department_head(self):
+        self.client.force_login(self.head)
+        response = self.client.get(reverse('reports:po_summary'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'PO1')
+
+    def test_background_build(self):
+        self.client.force_login(self.head)
+        self.client.get(reverse('reports:po_summary') + '?background=1')
+        self.assertFalse(Job.objects.exists())
+
+        response = self.client.post(reverse('reports:po_summary'))
+        job = Job.objects.get(kind='reports.po_report')
+        self.assertRedirects(response, reverse('reports:po_summary') + f'?job={job.id}', fetch_redirect_response=False)
+        self.assertContains(self.client.get(response.url), 'is queued')
+
+        run_pending_jobs()
+        response = self.client.get(response.url)
+        self.assertEqual(response.context['report']['PO1']['score'], Decimal('70.00'))
+
+    def test_background_build_requires_csrf_and_valid_job_id(self):
+        client = self.client_class(enforce_csrf_checks=True)
+        client.force_login(self.head)
+        self.assertEqual(client.post(reverse('reports:po_summary')).status_code, 403)
+        self.assertFalse(Job.objects.exists())
+        self.assertEqual(client.get(reverse('reports:po_summary') + '?job=abc').status_code, 404)
+        self.assertEqual(client.get(reverse('reports:po_summary') + '?job=999').status_code, 404)
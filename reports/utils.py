@@ -1,68 +1,49 @@
-from django.db.models import Sum, DecimalField
-from django.db.models.functions import Coalesce
-from collections import defaultdict
 from decimal import Decimal
 import logging
 
+from django.db.models import Count, DecimalField, F, Sum
+
 from grades.models import Grade
-from courses.models import Course, Assessment
-from outcomes.models import LO_PO_Contribution
-from accounts.models import CustomUser as User
 
 logger = logging.getLogger(__name__)
 
-def get_aggregated_po_report():
-    all_grades = Grade.objects.select_related(
-        'student', 
-        'assessment__course', 
-        'learning_outcome'
-    ).all()
-
-    if not all_grades:
-        return {"report_available": False, "data": {}, "message": "No grade data available for reporting."}
-
-    
-    po_totals = defaultdict(Decimal)
-    po_student_counts = defaultdict(set) 
-
-    contributions = LO_PO_Contribution.objects.select_related('program_outcome').all()
-    lo_contributions_map = defaultdict(list)
-    for c in contributions:
-        lo_contributions_map[c.learning_outcome_id].append(c)
+# Grade -> Assessment -> outcomes.AssessmentPOWeight (precomputed ALO x LO_PO x ECTS weights)
+PO_WEIGHT_PATH = 'assessment__po_weights'
 
-    total_ects_in_system = Course.objects.aggregate(total=Coalesce(Sum('ects_credit'), Decimal(0)))['total']
 
-    if total_ects_in_system == 0:
-        return {"report_available": False, "data": {}, "message": "No ECTS credit data available."}
-
-    for grade in all_grades:
-        course = grade.assessment.course
-        student = grade.student
-        lo = grade.learning_outcome
-        
-        weighted_lo_score = grade.lo_mastery_score * (grade.assessment.weight_percentage / 100.0)
-
-        for contrib in lo_contributions_map.get(lo.id, []):
-            po_code = contrib.program_outcome.code
-            
-            contribution_amount = (
-                weighted_lo_score * (contrib.contribution_percentage / 100.0) * course.ects_credit
-            )
-            po_totals[po_code] += contribution_amount
-            po_student_counts[po_code].add(student.id) 
+def get_aggregated_po_report():
+    """
+    Department-wide PO attainment over every grade in the system.
+
+    For each PO the score is the ECTS- and weight-weighted share of the maximum
+    attainable contribution, i.e. the cohort-level equivalent of
+    grades.utils.calculate_weighted_po_score. The join of grades against the
+    assessment -> PO weight index and the SUM / COUNT(DISTINCT student)
+    aggregation run as a single grouped query, so memory does not grow with
+    the grade table.
+    """
+    rows = (
+        Grade.objects.filter(**{f'{PO_WEIGHT_PATH}__isnull': False})
+        .order_by()
+        .values(po_code=F(f'{PO_WEIGHT_PATH}__program_outcome__code'))
+        .annotate(
+            earned=Sum(F('score_percentage') * F(f'{PO_WEIGHT_PATH}__effective_weight'), output_field=DecimalField()),
+            possible=Sum(f'{PO_WEIGHT_PATH}__effective_weight'),
+            student_count=Count('student', distinct=True),
+        )
+        .order_by('po_code')
+    )
 
     final_po_report = {}
-    normalizing_factor = total_ects_in_system * 5 
-    
-    for po_code, po_total_score in po_totals.items():
-        if normalizing_factor > 0:
-            final_score = (po_total_score / normalizing_factor) * 100.0 
-        else:
-            final_score = 0.0
-
-        final_po_report[po_code] = {
-            'score': round(final_score, 2),
-            'student_count': len(po_student_counts[po_code])
+    for row in rows:
+        earned = Decimal(str(row['earned'] or 0))
+        possible = Decimal(str(row['possible'] or 0))
+        score = round(earned / possible, 2) if possible > 0 else Decimal("0.00")
+        final_po_report[row['po_code']] = {
+            'score': score,
+            'student_count': row['student_count'],
         }
 
-    return {"report_available": True, "data": final_po_report}
\ No newline at end of file
+    if not final_po_report:
+        return {"report_available": False, "data": {}, "message": "No grade data available for reporting."}
+    return {"report_available": True, "data": final_po_report}
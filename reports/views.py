@@ -1,17 +1,49 @@
-from django.shortcuts import render
+from decimal import Decimal
+
+from django.http import Http404
+from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import user_passes_test
+from django.urls import reverse
 from .utils import get_aggregated_po_report
 from accounts.models import UserRole 
+from jobs.models import Job, JobStatus
+from jobs.runner import enqueue
 
 def is_dept_head(user):
     return user.is_authenticated and user.role == UserRole.DEPT_HEAD
 
 @user_passes_test(is_dept_head, login_url='/accounts/login/')
 def aggregated_po_report_view(request):
-    report_data = get_aggregated_po_report()
+    # Starting a build is a write, so it only happens on a (CSRF-checked) POST.
+    if request.method == 'POST':
+        job = enqueue('reports.po_report', user=request.user)
+        return redirect(f"{reverse('reports:po_summary')}?job={job.id}")
+
+    job = None
+    if request.GET.get('job'):
+        try:
+            job_id = int(request.GET['job'])
+        except ValueError:
+            raise Http404("Invalid report job.")
+        job = get_object_or_404(Job, pk=job_id, kind='reports.po_report', created_by=request.user)
+
+    if job is None:
+        report_data = get_aggregated_po_report()
+    elif job.status == JobStatus.SUCCEEDED:
+        report_data = job.result
+        for row in report_data['data'].values():
+            row['score'] = Decimal(row['score'])
+    else:
+        report_data = {
+            'report_available': False,
+            'data': {},
+            'message': f"Report job #{job.id} is {job.get_status_display().lower()}.",
+        }
+
     context = {
         'report': report_data.get('data'),
         'is_available': report_data.get('report_available'),
         'message': report_data.get('message', 'PO Report is ready.'),
+        'job': job,
     }
     return render(request, 'reports/po_report.html', context)